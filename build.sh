@@ -167,6 +167,9 @@ mkdir -p /usr/lib/chi-voice
 cp -r /usr/share/chi-voice/. /usr/lib/chi-voice/
 chmod +x /usr/lib/chi-voice/voice.sh
 
+cp /usr/lib/chi-voice/chi-voice.service /usr/lib/systemd/user/chi-voice.service
+cp /usr/lib/chi-voice/chi-voice.socket /usr/lib/systemd/user/chi-voice.socket
+
 echo "==> chi-voice installed"
 
 # ---------------------------------------------------------------------------
@@ -318,6 +321,7 @@ EOF
 
 # User services (enabled for all users at login)
 systemctl --global enable chi-agent
+systemctl --global enable chi-voice.socket
 systemctl --global enable chi-firstboot
 
 echo "==> System services enabled"
@@ -8,22 +8,24 @@ Connects to Ollama, dispatches tool calls, and exposes two interfaces:
 """
 
 import argparse
-import json
+import atexit
+import functools
+import importlib
 import logging
 import sys
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
 import requests
 from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
 
-from tools.apps import launch_app
-from tools.packages import install_app, install_system, remove_app
-from tools.shell import run_shell
-from tools.system import get_network_status, set_network, manage_service
-from tools.envclone import envclone_init, envclone_up, envclone_down, envclone_code
+import jsonio
 
 OLLAMA_HOST = "http://localhost:11434"
 MODEL = "chi"  # loaded from Modelfile as 'chi' alias, falls back to qwen3:8b
+KNOWN_MODEL_PREFIXES = ("chi", "qwen3")  # local tags that satisfy ensure_model
+CHAT_TIMEOUT = (5, 120)  # (connect, read) — fail fast if Ollama is down, wait on generation
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,12 +33,21 @@ logging.basicConfig(
 )
 log = logging.getLogger("chi-agent")
 
+# One keep-alive connection pool to Ollama, shared by every chat round-trip
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0))
+_SESSION.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip, deflate"})
+atexit.register(_SESSION.close)
+
+# Tool handlers are blocking subprocess/D-Bus calls; run a batch side by side
+_TOOL_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tool")
+
 
 # ---------------------------------------------------------------------------
 # Tool registry
 # ---------------------------------------------------------------------------
 
-TOOLS = [
+TOOLS: list[dict[str, Any]] = [
     {
         "type": "function",
         "function": {
@@ -204,22 +215,45 @@ TOOLS = [
     },
 ]
 
-TOOL_MAP = {
-    "launch_app": lambda args: launch_app(args["app"]),
-    "install_app": lambda args: install_app(args["name"]),
-    "install_system": lambda args: install_system(args["name"]),
-    "remove_app": lambda args: remove_app(args["name"]),
-    "run_shell": lambda args: run_shell(args["command"]),
-    "get_network_status": lambda args: get_network_status(),
-    "set_network": lambda args: set_network(args["connection"], args["enable"]),
-    "manage_service": lambda args: manage_service(args["service"], args["action"]),
-    "envclone_init": lambda args: envclone_init(args["env_type"], args["name"]),
-    "envclone_up": lambda args: envclone_up(args["name"]),
-    "envclone_down": lambda args: envclone_down(args["name"]),
-    "envclone_code": lambda args: envclone_code(args["name"]),
+# The tool schema never changes at runtime — encode it once and splice the
+# bytes into every chat request body instead of re-serializing per turn.
+_TOOLS_JSON = jsonio.dumpb(TOOLS)
+_MODEL_JSON = jsonio.dumpb(MODEL)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Tool name -> (module, function). Modules are imported on first use so the
+# daemon doesn't pay for tools nobody calls. Each function takes the tool's
+# schema parameters as keyword arguments.
+_TOOL_IMPORTS: dict[str, tuple[str, str]] = {
+    "launch_app": ("tools.apps", "launch_app"),
+    "install_app": ("tools.packages", "install_app"),
+    "install_system": ("tools.packages", "install_system"),
+    "remove_app": ("tools.packages", "remove_app"),
+    "run_shell": ("tools.shell", "run_shell"),
+    "get_network_status": ("tools.system", "get_network_status"),
+    "set_network": ("tools.system", "set_network"),
+    "manage_service": ("tools.system", "manage_service"),
+    "envclone_init": ("tools.envclone", "envclone_init"),
+    "envclone_up": ("tools.envclone", "envclone_up"),
+    "envclone_down": ("tools.envclone", "envclone_down"),
+    "envclone_code": ("tools.envclone", "envclone_code"),
 }
 
 
+# Only schema-declared arguments reach a handler (e.g. the model can't
+# override run_shell's timeout)
+_TOOL_PARAMS: dict[str, frozenset[str]] = {
+    t["function"]["name"]: frozenset(t["function"]["parameters"]["properties"])
+    for t in TOOLS
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve(name: str) -> Callable[..., Any]:
+    module, fn = _TOOL_IMPORTS[name]
+    return getattr(importlib.import_module(module), fn)
+
+
 # ---------------------------------------------------------------------------
 # Ollama chat loop
 # ---------------------------------------------------------------------------
@@ -227,12 +261,12 @@ TOOL_MAP = {
 def ensure_model() -> None:
     """Pull model if not present."""
     try:
-        resp = requests.get(f"{OLLAMA_HOST}/api/tags", timeout=5)
+        resp = _SESSION.get(f"{OLLAMA_HOST}/api/tags", timeout=5)
         resp.raise_for_status()
-        tags = [m["name"] for m in resp.json().get("models", [])]
-        if not any(t.startswith("chi") or t.startswith("qwen3") for t in tags):
+        models = resp.json().get("models", ())
+        if not any(m.get("name", "").startswith(KNOWN_MODEL_PREFIXES) for m in models):
             log.info("Model not found locally, pulling qwen3:8b...")
-            requests.post(
+            _SESSION.post(
                 f"{OLLAMA_HOST}/api/pull",
                 json={"name": "qwen3:8b"},
                 timeout=600,
@@ -241,34 +275,110 @@ def ensure_model() -> None:
         log.warning(f"Could not verify model: {e}")
 
 
-def chat(prompt: str, history: list[dict] | None = None) -> tuple[str, list[dict]]:
+def _parse_tool_call(tc: dict) -> tuple[str, dict]:
+    fn_name = tc["function"]["name"]
+    fn_args = tc["function"].get("arguments", {})
+    if isinstance(fn_args, str):
+        try:
+            fn_args = jsonio.loads(fn_args)
+        except jsonio.JSONDecodeError:
+            fn_args = {}
+    return fn_name, fn_args
+
+
+def _run_tool(fn_name: str, fn_args: dict) -> Any:
+    if fn_name not in _TOOL_IMPORTS:
+        return {"error": f"Unknown tool: {fn_name}"}
+    try:
+        params = _TOOL_PARAMS[fn_name]
+        return _resolve(fn_name)(**{k: v for k, v in fn_args.items() if k in params})
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _chat_body(messages: list[dict]) -> bytes:
+    """Build the /api/chat request body around the pre-encoded tool schema."""
+    return b'{"model":%s,"stream":true,"tools":%s,"messages":%s}' % (
+        _MODEL_JSON, _TOOLS_JSON, jsonio.dumpb(messages),
+    )
+
+
+def _read_stream(resp: requests.Response, on_stream: Callable[[], None] | None) -> dict:
+    """
+    Assemble the NDJSON frames of a streamed /api/chat reply into one
+    assistant message. Calls on_stream once, when the first token arrives.
+    """
+    message: dict = {"role": "assistant"}
+    content: list[str] = []
+    thinking: list[str] = []
+    tool_calls: list[dict] = []
+    started = False
+
+    # Each frame is decoded as soon as its line arrives, so memory stays
+    # bounded by one frame rather than the whole reply
+    for line in resp.iter_lines():
+        if not line:
+            continue
+        try:
+            frame = jsonio.loads(line)
+        except jsonio.JSONDecodeError as e:
+            raise requests.RequestException(f"Malformed stream frame: {e}") from e
+        if "error" in frame:
+            raise requests.RequestException(frame["error"])
+
+        delta = frame.get("message", {})
+        if delta.get("content"):
+            content.append(delta["content"])
+        if delta.get("thinking"):
+            thinking.append(delta["thinking"])
+        if delta.get("tool_calls"):
+            tool_calls.extend(delta["tool_calls"])
+
+        if not started and on_stream is not None:
+            started = True
+            on_stream()
+        if frame.get("done"):
+            break
+
+    message["content"] = "".join(content)
+    if thinking:
+        message["thinking"] = "".join(thinking)
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return message
+
+
+def chat(
+    prompt: str,
+    history: list[dict] | None = None,
+    on_stream: Callable[[], None] | None = None,
+    on_tools: Callable[[], None] | None = None,
+) -> tuple[str, list[dict]]:
     """
     Send a prompt to Ollama with tool support.
     Returns (final_text_response, updated_history).
+    on_stream, if given, is called each time Ollama starts streaming a reply;
+    on_tools, each time a batch of tool calls is about to run.
     """
     if history is None:
         history = []
 
-    messages = history + [{"role": "user", "content": prompt}]
+    messages: list[dict[str, Any]] = history + [{"role": "user", "content": prompt}]
 
     while True:
         try:
-            resp = requests.post(
+            with _SESSION.post(
                 f"{OLLAMA_HOST}/api/chat",
-                json={
-                    "model": MODEL,
-                    "messages": messages,
-                    "tools": TOOLS,
-                    "stream": False,
-                },
-                timeout=120,
-            )
-            resp.raise_for_status()
+                data=_chat_body(messages),
+                headers=_JSON_HEADERS,
+                timeout=CHAT_TIMEOUT,
+                stream=True,
+            ) as resp:
+                resp.raise_for_status()
+                message = _read_stream(resp, on_stream)
         except requests.RequestException as e:
             return f"Error connecting to Ollama: {e}", messages
 
-        data = resp.json()
-        message = data.get("message", {})
         messages.append(message)
 
         tool_calls = message.get("tool_calls", [])
@@ -276,27 +386,21 @@ def chat(prompt: str, history: list[dict] | None = None) -> tuple[str, list[dict
             # No more tool calls — return final response
             return message.get("content", ""), messages
 
-        # Dispatch tool calls
-        for tc in tool_calls:
-            fn_name = tc["function"]["name"]
-            fn_args = tc["function"].get("arguments", {})
-            if isinstance(fn_args, str):
-                try:
-                    fn_args = json.loads(fn_args)
-                except json.JSONDecodeError:
-                    fn_args = {}
-
+        # Dispatch tool calls — independent calls run concurrently, results
+        # are appended in tool_calls order as Ollama expects
+        calls = [_parse_tool_call(tc) for tc in tool_calls]
+        for fn_name, fn_args in calls:
             log.info(f"Tool call: {fn_name}({fn_args})")
+        if on_tools is not None:
+            on_tools()
 
-            handler = TOOL_MAP.get(fn_name)
-            if handler:
-                try:
-                    result = handler(fn_args)
-                except Exception as e:
-                    result = {"error": str(e)}
-            else:
-                result = {"error": f"Unknown tool: {fn_name}"}
+        if len(calls) == 1:
+            results = [_run_tool(*calls[0])]
+        else:
+            futures = [_TOOL_POOL.submit(_run_tool, *call) for call in calls]
+            results = [f.result() for f in futures]
 
+        for (fn_name, _), result in zip(calls, results):
             log.info(f"Tool result: {result}")
 
             # Persist tool data for the Data tab
@@ -308,7 +412,7 @@ def chat(prompt: str, history: list[dict] | None = None) -> tuple[str, list[dict
 
             messages.append({
                 "role": "tool",
-                "content": json.dumps(result) if not isinstance(result, str) else result,
+                "content": result if isinstance(result, str) else jsonio.dumps(result),
             })
 
 
@@ -8,17 +8,17 @@ can communicate with it via IPC without needing a network socket.
 Interface methods:
   - Ask(prompt: str) -> str           blocking, returns final response
   - AskAsync(prompt: str) -> str      returns job ID, emits ResponseReady
-  - GetStatus() -> str                "ready" | "thinking" | "error"
+  - GetStatus() -> str                "ready" | "thinking" | "streaming" | "error"
 
 Signals:
   - ResponseReady(job_id: str, response: str)
   - StatusChanged(status: str)
 """
 
-import json
 import logging
 import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable
 
 from pydbus import SessionBus
@@ -31,6 +31,17 @@ log = logging.getLogger("chi-agent.dbus")
 
 DBUS_NAME = "io.chios.Agent"
 DBUS_PATH = "/io/chios/Agent"
+ASK_WORKERS = 4  # concurrent AskAsync jobs; extra jobs queue in the pool
+
+_MAIN_TID: int | None = None  # thread running the GLib main loop
+
+
+def _emit(fn: Callable, *args) -> None:
+    """Emit a D-Bus signal directly on the loop thread, else hop via idle_add."""
+    if threading.get_ident() == _MAIN_TID:
+        fn(*args)
+    else:
+        GLib.idle_add(fn, *args)
 
 DBUS_XML = """
 <node>
@@ -55,6 +66,12 @@ DBUS_XML = """
       <arg type='s' name='json' direction='out'/>
     </method>
 
+    <method name='GetHistoryPage'>
+      <arg type='i' name='limit' direction='in'/>
+      <arg type='i' name='offset' direction='in'/>
+      <arg type='s' name='json' direction='out'/>
+    </method>
+
     <method name='GetData'>
       <arg type='i' name='limit' direction='in'/>
       <arg type='s' name='json' direction='out'/>
@@ -95,55 +112,80 @@ class ChiAgentService:
         self._chat = chat_fn
         self._status = "ready"
         self._history: list[dict] = []
+        # Guards _history and _inflight only — never held across the Ollama call,
+        # so concurrent clients (overlay, panel, voice) don't serialize end-to-end.
         self._lock = threading.Lock()
+        self._inflight = 0
+        self._pool = ThreadPoolExecutor(max_workers=ASK_WORKERS, thread_name_prefix="chi-ask")
 
     def Ask(self, prompt: str) -> str:
-        with self._lock:
-            self._set_status("thinking")
-            try:
-                hist.append_message("user", prompt)
-                response, self._history = self._chat(prompt, self._history)
-                hist.append_message("assistant", response)
-                self._set_status("ready")
-                return response
-            except Exception as e:
-                self._set_status("error")
-                log.error(f"D-Bus Ask error: {e}")
-                return f"Error: {e}"
+        try:
+            return self._ask(prompt)
+        except Exception as e:
+            log.error(f"D-Bus Ask error: {e}")
+            return f"Error: {e}"
 
     def AskAsync(self, prompt: str) -> str:
         job_id = str(uuid.uuid4())[:8]
 
         def _worker():
-            with self._lock:
-                self._set_status("thinking")
-                try:
-                    hist.append_message("user", prompt)
-                    response, self._history = self._chat(prompt, self._history)
-                    hist.append_message("assistant", response)
-                    self._set_status("ready")
-                except Exception as e:
-                    response = f"Error: {e}"
-                    self._set_status("error")
-                    log.error(f"D-Bus AskAsync error: {e}")
-            GLib.idle_add(self.ResponseReady, job_id, response)
-
-        threading.Thread(target=_worker, daemon=True).start()
+            try:
+                response = self._ask(prompt)
+            except Exception as e:
+                response = f"Error: {e}"
+                log.error(f"D-Bus AskAsync error: {e}")
+            _emit(self.ResponseReady, job_id, response)
+
+        self._pool.submit(_worker)
         return job_id
 
+    def _ask(self, prompt: str) -> str:
+        with self._lock:
+            self._inflight += 1
+            history = list(self._history)
+        self._set_status("thinking")
+        try:
+            hist.append_message("user", prompt)
+            response, new_history = self._chat(
+                prompt, history, on_stream=self._on_stream, on_tools=self._on_tools,
+            )
+            hist.append_message("assistant", response)
+        except Exception:
+            with self._lock:
+                self._inflight -= 1
+            self._set_status("error")
+            raise
+
+        with self._lock:
+            # Append only this turn: an ask that overlapped ours may already
+            # have extended _history past the snapshot we started from
+            self._history.extend(new_history[len(history):])
+            self._inflight -= 1
+            idle = self._inflight == 0
+        if idle:
+            self._set_status("ready")
+        return response
+
     def GetStatus(self) -> str:
         return self._status
 
     def GetHistory(self, limit: int) -> str:
         try:
-            return json.dumps(hist.get_history(limit))
+            return hist.get_history_json(limit)
         except Exception as e:
             log.error(f"GetHistory error: {e}")
             return "[]"
 
+    def GetHistoryPage(self, limit: int, offset: int) -> str:
+        try:
+            return hist.get_history_json(limit, offset)
+        except Exception as e:
+            log.error(f"GetHistoryPage error: {e}")
+            return "[]"
+
     def GetData(self, limit: int) -> str:
         try:
-            return json.dumps(hist.get_data(limit))
+            return hist.get_data_json(limit)
         except Exception as e:
             log.error(f"GetData error: {e}")
             return "[]"
@@ -167,14 +209,21 @@ class ChiAgentService:
         except Exception as e:
             log.error(f"ClearData error: {e}")
 
+    def _on_stream(self) -> None:
+        self._set_status("streaming")
+
+    def _on_tools(self) -> None:
+        # Back to "thinking" while tools run and Ollama digests their results
+        self._set_status("thinking")
+
     def _set_status(self, status: str) -> None:
         self._status = status
-        # Emit signal safely from the GLib main loop thread
-        GLib.idle_add(self.StatusChanged, status)
+        _emit(self.StatusChanged, status)
 
 
 def run_dbus_service() -> None:
     """Register chi-agent on session D-Bus. Blocks until GLib loop exits."""
+    global _MAIN_TID
     from agent import chat  # lazy import to avoid circular
 
     bus = SessionBus()
@@ -184,6 +233,7 @@ def run_dbus_service() -> None:
         bus.publish(DBUS_NAME, (DBUS_PATH, service))
         log.info(f"D-Bus service registered: {DBUS_NAME}")
         loop = GLib.MainLoop()
+        _MAIN_TID = threading.get_ident()
         loop.run()
     except Exception as e:
         log.error(f"D-Bus service failed: {e}")
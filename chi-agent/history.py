@@ -1,28 +1,99 @@
 """
 Persistent conversation history and tool data storage for chi-agent.
 Stored in SQLite at ~/.local/share/chiOS/history.db
+
+Writes from the chat path are queued and committed by a single background
+writer thread, so callers never wait on an fsync. Readers call flush() first
+to see their own writes.
 """
 
-import json
+import atexit
+import functools
+import logging
+import queue
 import sqlite3
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+import jsonio
+
+log = logging.getLogger("chi-agent.history")
 
 DB_PATH = Path.home() / ".local/share/chiOS/history.db"
 SESSION_GAP_HOURS = 2  # Start new conversation if gap > 2h
 
+SCHEMA_VERSION = 1  # 1: messages moved from conversations.messages JSON into their own table
+
+# Statements on the hot paths. Kept as constants so every call hits the
+# connection's prepared-statement cache instead of re-parsing SQL.
+_Q_CONV_UPDATED_AT = "SELECT updated_at FROM conversations WHERE id=?"
+_Q_INSERT_CONV = "INSERT INTO conversations (started_at, updated_at, messages) VALUES (?,?,'[]')"
+_Q_TOUCH_CONV = "UPDATE conversations SET updated_at=? WHERE id=?"
+_Q_INSERT_MSG = (
+    "INSERT INTO messages (conv_id, idx, role, content, at) VALUES "
+    "(?, (SELECT COALESCE(MAX(idx) + 1, 0) FROM messages WHERE conv_id=?), ?, ?, ?)"
+)
+_Q_INSERT_MSG_AT = (
+    "INSERT OR IGNORE INTO messages (conv_id, idx, role, content, at) VALUES (?,?,?,?,?)"
+)
+_Q_INSERT_DATA = "INSERT INTO collected_data (collected_at, tool, data) VALUES (?,?,?)"
+_Q_RECENT_CONVS = (
+    "SELECT id, started_at, updated_at "
+    "FROM conversations ORDER BY updated_at DESC LIMIT ?"
+)
+_Q_RECENT_SUMMARIES = (
+    "SELECT c.id, c.started_at, c.updated_at, "
+    "(SELECT COUNT(*) FROM messages m WHERE m.conv_id = c.id) AS message_count, "
+    "(SELECT substr(m.content, 1, 120) FROM messages m "
+    " WHERE m.conv_id = c.id AND m.role = 'user' ORDER BY m.idx LIMIT 1) AS preview "
+    "FROM conversations c ORDER BY c.updated_at DESC LIMIT ? OFFSET ?"
+)
+_Q_RECENT_MSGS = (
+    "SELECT conv_id, role, content, at FROM messages WHERE conv_id IN "
+    "(SELECT id FROM conversations ORDER BY updated_at DESC LIMIT ?) "
+    "ORDER BY conv_id, idx"
+)
+# Cheap fingerprints of each table — any write changes them, so they double
+# as cache keys for the read paths the overlay polls.
+_Q_HISTORY_KEY = "SELECT IFNULL(MAX(updated_at), ''), COUNT(*) FROM conversations"
+_Q_DATA_KEY = "SELECT IFNULL(MAX(id), 0), COUNT(*) FROM collected_data"
+_Q_RECENT_DATA = (
+    "SELECT tool, collected_at, data FROM collected_data "
+    "ORDER BY collected_at DESC LIMIT ?"
+)
+
 _con: sqlite3.Connection | None = None
 _current_conv_id: int | None = None
 
+_WRITE_Q: queue.Queue = queue.Queue()
+_db_lock = threading.Lock()  # serializes every statement and transaction on _con
+_open_lock = threading.Lock()  # guards creating _con
+_writer: threading.Thread | None = None
+_writer_start_lock = threading.Lock()
+
 
 def _get_con() -> sqlite3.Connection:
-    global _con
     if _con is None:
-        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-        _con = sqlite3.connect(str(DB_PATH), check_same_thread=False)
-        _con.row_factory = sqlite3.Row
-        _con.execute("""
+        with _open_lock:
+            if _con is None:
+                _open_con()
+    return _con
+
+
+def _open_con() -> None:
+    """Open the database, create the schema and migrate. Call with _open_lock held."""
+    global _con
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+    try:
+        con.row_factory = sqlite3.Row
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("PRAGMA temp_store=MEMORY")
+        con.execute("PRAGMA mmap_size=134217728")  # 128 MiB
+        con.execute("""
             CREATE TABLE IF NOT EXISTS conversations (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 started_at TEXT NOT NULL,
@@ -30,7 +101,17 @@ def _get_con() -> sqlite3.Connection:
                 messages TEXT NOT NULL DEFAULT '[]'
             )
         """)
-        _con.execute("""
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                conv_id INTEGER NOT NULL,
+                idx INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                at TEXT NOT NULL,
+                PRIMARY KEY (conv_id, idx)
+            )
+        """)
+        con.execute("""
             CREATE TABLE IF NOT EXISTS collected_data (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 collected_at TEXT NOT NULL,
@@ -38,77 +119,213 @@ def _get_con() -> sqlite3.Connection:
                 data TEXT NOT NULL
             )
         """)
-        _con.commit()
-    return _con
+        # Newest-first listings walk these instead of scanning + sorting
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conv_updated ON conversations(updated_at DESC)"
+        )
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_data_collected ON collected_data(collected_at DESC)"
+        )
+        con.commit()
+        _migrate(con)
+    except BaseException:
+        con.close()
+        raise
+    # Publish only a fully set-up connection to other threads
+    _con = con
+
 
+def _migrate(con: sqlite3.Connection) -> None:
+    """Bring an older database up to SCHEMA_VERSION."""
+    version = con.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
 
-def _get_or_create_conversation() -> int:
+    with con:
+        # v0 -> v1: split the per-conversation JSON blob into message rows
+        legacy = con.execute(
+            "SELECT id, messages FROM conversations WHERE messages != '[]'"
+        ).fetchall()
+        con.executemany(_Q_INSERT_MSG_AT, (
+            (row["id"], idx, m.get("role", ""), m.get("content", ""), m.get("at", ""))
+            for row in legacy
+            for idx, m in enumerate(jsonio.loads(row["messages"]))
+        ))
+        con.execute("UPDATE conversations SET messages='[]'")
+        con.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+
+def _writer_loop() -> None:
+    """Drain the write queue, committing everything pending in one transaction."""
+    while True:
+        batch = [_WRITE_Q.get()]
+        while True:
+            try:
+                batch.append(_WRITE_Q.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            # Opened here, not before the loop: an open failure drops this
+            # batch but keeps the writer alive and the queue accounted for
+            con = _get_con()
+            with _db_lock:
+                _commit_batch(con, batch)
+        except Exception as e:
+            log.error(f"History write failed ({len(batch)} queued writes dropped): {e}")
+        finally:
+            for _ in batch:
+                _WRITE_Q.task_done()
+
+
+def _commit_batch(con: sqlite3.Connection, batch: list) -> None:
+    """
+    Apply batch in one transaction, each write under its own SAVEPOINT so a
+    failing write is rolled back and logged without undoing the rest.
+    """
+    con.execute("BEGIN")
+    try:
+        for fn, args in batch:
+            con.execute("SAVEPOINT write")
+            try:
+                fn(con, *args)
+            except Exception as e:
+                con.execute("ROLLBACK TO write")
+                log.error(f"History write {fn.__name__} dropped: {e}")
+            con.execute("RELEASE write")
+        con.commit()
+    except BaseException:
+        con.rollback()
+        raise
+
+
+def _enqueue(fn: Callable[..., None], *args: Any) -> None:
+    global _writer
+    if _writer is None:
+        with _writer_start_lock:
+            if _writer is None:
+                _writer = threading.Thread(
+                    target=_writer_loop, name="chi-history-writer", daemon=True
+                )
+                _writer.start()
+    _WRITE_Q.put((fn, args))
+
+
+def flush() -> None:
+    """Block until every queued write has been committed."""
+    # A dead writer would never call task_done; don't wait on it
+    if _writer is not None and _writer.is_alive():
+        _WRITE_Q.join()
+
+
+atexit.register(flush)
+
+
+def _get_or_create_conversation(con: sqlite3.Connection, now: str) -> int:
     global _current_conv_id
-    con = _get_con()
-    now = datetime.now().isoformat()
 
     if _current_conv_id is not None:
-        row = con.execute(
-            "SELECT updated_at FROM conversations WHERE id=?",
-            (_current_conv_id,)
-        ).fetchone()
+        row = con.execute(_Q_CONV_UPDATED_AT, (_current_conv_id,)).fetchone()
         if row:
             updated = datetime.fromisoformat(row["updated_at"])
-            if datetime.now() - updated < timedelta(hours=SESSION_GAP_HOURS):
+            if datetime.fromisoformat(now) - updated < timedelta(hours=SESSION_GAP_HOURS):
                 return _current_conv_id
 
-    cur = con.execute(
-        "INSERT INTO conversations (started_at, updated_at, messages) VALUES (?,?,?)",
-        (now, now, "[]")
-    )
-    con.commit()
+    cur = con.execute(_Q_INSERT_CONV, (now, now))
     _current_conv_id = cur.lastrowid
     return _current_conv_id
 
 
+def _write_message(con: sqlite3.Connection, role: str, content: str, now: str) -> None:
+    conv_id = _get_or_create_conversation(con, now)
+    con.execute(_Q_INSERT_MSG, (conv_id, conv_id, role, content, now))
+    con.execute(_Q_TOUCH_CONV, (now, conv_id))
+
+
+def _write_tool_data(con: sqlite3.Connection, tool: str, data: bytes, now: str) -> None:
+    con.execute(_Q_INSERT_DATA, (now, tool, data))
+
+
 def append_message(role: str, content: str) -> None:
-    """Append a user or assistant message to the current conversation."""
-    conv_id = _get_or_create_conversation()
+    """Queue a user or assistant message for the current conversation."""
+    _enqueue(_write_message, role, content, datetime.now().isoformat())
+
+
+def record_tool_data(tool: str, data: Any) -> None:
+    """
+    Queue data returned by a tool call. Encoded here, on the caller's
+    thread, so unserializable data raises to the caller instead of
+    failing inside the writer.
+    """
+    _enqueue(_write_tool_data, tool, jsonio.dumpb(data), datetime.now().isoformat())
+
+
+def get_history(limit: int = 30, include_messages: bool = False) -> list[dict]:
+    """
+    Return the most recent conversations, newest first.
+    Each entry carries id, timestamps, message_count and preview; the full
+    message list is only loaded when include_messages is True.
+    The result is cached until the next write — treat it as read-only.
+    """
+    key = _history_key()
+    if include_messages:
+        return _load_history(limit, key)
+    return _load_summaries(limit, 0, key)
+
+
+def get_history_json(limit: int = 30, offset: int = 0) -> str:
+    """
+    Summaries of `limit` conversations, skipping the `offset` newest, as a
+    JSON string cached alongside the rows.
+    """
+    return _summaries_json(limit, offset, _history_key())
+
+
+def _history_key() -> tuple:
+    flush()
     con = _get_con()
-    now = datetime.now().isoformat()
+    with _db_lock:
+        return tuple(con.execute(_Q_HISTORY_KEY).fetchone())
 
-    row = con.execute(
-        "SELECT messages FROM conversations WHERE id=?", (conv_id,)
-    ).fetchone()
-    msgs = json.loads(row["messages"]) if row else []
-    msgs.append({"role": role, "content": content, "at": now})
 
-    con.execute(
-        "UPDATE conversations SET messages=?, updated_at=? WHERE id=?",
-        (json.dumps(msgs), now, conv_id)
-    )
-    con.commit()
+@functools.lru_cache(maxsize=8)
+def _summaries_json(limit: int, offset: int, key: tuple) -> str:
+    return jsonio.dumps(_load_summaries(limit, offset, key))
 
 
-def record_tool_data(tool: str, data: Any) -> None:
-    """Record data returned by a tool call."""
+@functools.lru_cache(maxsize=8)
+def _load_summaries(limit: int, offset: int, _key: tuple) -> list[dict]:
     con = _get_con()
-    con.execute(
-        "INSERT INTO collected_data (collected_at, tool, data) VALUES (?,?,?)",
-        (datetime.now().isoformat(), tool, json.dumps(data))
-    )
-    con.commit()
+    with _db_lock:
+        rows = con.execute(_Q_RECENT_SUMMARIES, (limit, offset)).fetchall()
+    return [
+        {
+            "id": r["id"],
+            "started_at": r["started_at"],
+            "updated_at": r["updated_at"],
+            "message_count": r["message_count"],
+            "preview": r["preview"] if r["preview"] is not None else "(empty)",
+        }
+        for r in rows
+    ]
 
 
-def get_history(limit: int = 30) -> list[dict]:
-    """Return the most recent conversations, newest first."""
+@functools.lru_cache(maxsize=8)
+def _load_history(limit: int, _key: tuple) -> list[dict]:
     con = _get_con()
-    rows = con.execute(
-        "SELECT id, started_at, updated_at, messages "
-        "FROM conversations ORDER BY updated_at DESC LIMIT ?",
-        (limit,)
-    ).fetchall()
+    with _db_lock:
+        rows = con.execute(_Q_RECENT_CONVS, (limit,)).fetchall()
+        msg_rows = con.execute(_Q_RECENT_MSGS, (limit,)).fetchall()
+
+    by_conv: dict[int, list[dict]] = {row["id"]: [] for row in rows}
+    for m in msg_rows:
+        by_conv[m["conv_id"]].append(
+            {"role": m["role"], "content": m["content"], "at": m["at"]}
+        )
 
     result = []
     for row in rows:
-        msgs = json.loads(row["messages"])
-        user_msgs = [m for m in msgs if m["role"] == "user"]
-        preview = user_msgs[0]["content"][:120] if user_msgs else "(empty)"
+        msgs = by_conv[row["id"]]
+        preview = next((m["content"][:120] for m in msgs if m["role"] == "user"), "(empty)")
         result.append({
             "id": row["id"],
             "started_at": row["started_at"],
@@ -123,44 +340,71 @@ def get_history(limit: int = 30) -> list[dict]:
 def delete_conversation(conv_id: int) -> bool:
     """Delete a single conversation by ID. Returns True if a row was deleted."""
     global _current_conv_id
+    flush()
     con = _get_con()
-    cur = con.execute("DELETE FROM conversations WHERE id=?", (conv_id,))
-    con.commit()
-    if _current_conv_id == conv_id:
-        _current_conv_id = None
+    with _db_lock, con:
+        cur = con.execute("DELETE FROM conversations WHERE id=?", (conv_id,))
+        con.execute("DELETE FROM messages WHERE conv_id=?", (conv_id,))
+        if _current_conv_id == conv_id:
+            _current_conv_id = None
     return cur.rowcount > 0
 
 
 def clear_all_history() -> None:
     """Permanently delete all conversations and collected data."""
     global _current_conv_id
+    flush()
     con = _get_con()
-    con.execute("DELETE FROM conversations")
-    con.execute("DELETE FROM collected_data")
-    con.commit()
-    _current_conv_id = None
+    with _db_lock, con:
+        con.execute("DELETE FROM conversations")
+        con.execute("DELETE FROM messages")
+        con.execute("DELETE FROM collected_data")
+        _current_conv_id = None
 
 
 def clear_data() -> None:
     """Permanently delete all collected tool data (keeps conversations)."""
+    flush()
     con = _get_con()
-    con.execute("DELETE FROM collected_data")
-    con.commit()
+    with _db_lock, con:
+        con.execute("DELETE FROM collected_data")
 
 
 def get_data(limit: int = 50) -> list[dict]:
-    """Return recently collected tool data, newest first."""
+    """
+    Return recently collected tool data, newest first.
+    The result is cached until the next write — treat it as read-only.
+    """
+    return _load_data(limit, _data_key())
+
+
+def get_data_json(limit: int = 50) -> str:
+    """get_data(limit) as a JSON string, cached alongside the rows."""
+    return _data_json(limit, _data_key())
+
+
+def _data_key() -> tuple:
+    flush()
+    con = _get_con()
+    with _db_lock:
+        return tuple(con.execute(_Q_DATA_KEY).fetchone())
+
+
+@functools.lru_cache(maxsize=8)
+def _data_json(limit: int, key: tuple) -> str:
+    return jsonio.dumps(_load_data(limit, key))
+
+
+@functools.lru_cache(maxsize=8)
+def _load_data(limit: int, _key: tuple) -> list[dict]:
     con = _get_con()
-    rows = con.execute(
-        "SELECT tool, collected_at, data FROM collected_data "
-        "ORDER BY collected_at DESC LIMIT ?",
-        (limit,)
-    ).fetchall()
+    with _db_lock:
+        rows = con.execute(_Q_RECENT_DATA, (limit,)).fetchall()
     return [
         {
             "tool": r["tool"],
             "collected_at": r["collected_at"],
-            "data": json.loads(r["data"]),
+            "data": jsonio.loads(r["data"]),
         }
         for r in rows
     ]
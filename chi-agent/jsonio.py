@@ -0,0 +1,57 @@
+"""
+JSON encode/decode helpers for chi-agent.
+
+Uses orjson when it is installed (several times faster than the stdlib on
+tool results and history payloads) and falls back to the json module.
+"""
+
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    import json
+
+    JSONDecodeError = orjson.JSONDecodeError
+
+    # orjson rejects what json.dumps accepted: non-str dict keys are handled
+    # by OPT_NON_STR_KEYS, and ints beyond 64 bits fall back to the stdlib
+    _OPTS = orjson.OPT_NON_STR_KEYS
+
+    def dumpb(obj: Any) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes."""
+        try:
+            return orjson.dumps(obj, option=_OPTS)
+        except TypeError:
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def dumps(obj: Any) -> str:
+        """Serialize obj to a JSON str."""
+        try:
+            return orjson.dumps(obj, option=_OPTS).decode()
+        except TypeError:
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def loads(data: bytes | str) -> Any:
+        """Parse JSON from bytes or str."""
+        return orjson.loads(data)
+
+else:
+    import json
+
+    JSONDecodeError = json.JSONDecodeError
+
+    def dumpb(obj: Any) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def dumps(obj: Any) -> str:
+        """Serialize obj to a JSON str."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def loads(data: bytes | str) -> Any:
+        """Parse JSON from bytes or str."""
+        return json.loads(data)
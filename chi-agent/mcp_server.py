@@ -16,13 +16,21 @@ Claude Code users can add this server in their MCP config:
   }
 """
 
-import json
+import asyncio
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from typing import Any
 
+import jsonio
+
 log = logging.getLogger("chi-agent.mcp")
 
+# Tools block on subprocesses; run them here so the stdio loop keeps
+# serving other requests while one is in flight
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="chi-tool")
+
 
 def run_mcp_server() -> None:
     """Run MCP server over stdio. Blocks until stdin closes."""
@@ -42,158 +50,181 @@ def run_mcp_server() -> None:
 
     server = Server("chi-agent")
 
-    @server.list_tools()
-    async def list_tools() -> list[types.Tool]:
-        return [
-            types.Tool(
-                name="chi_launch_app",
-                description="Launch a desktop application on chiOS",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "app": {"type": "string", "description": "App name (e.g. firefox, kitty, codium)"},
-                    },
-                    "required": ["app"],
-                },
-            ),
-            types.Tool(
-                name="chi_install_app",
-                description="Install a GUI app via flatpak (immediate) or rpm-ostree (staged)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string", "description": "App or package name"},
-                    },
-                    "required": ["name"],
-                },
-            ),
-            types.Tool(
-                name="chi_install_system",
-                description="Install a system package via rpm-ostree (requires reboot)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string", "description": "RPM package name"},
-                    },
-                    "required": ["name"],
-                },
-            ),
-            types.Tool(
-                name="chi_remove_app",
-                description="Remove an installed application",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string", "description": "App or package name"},
-                    },
-                    "required": ["name"],
+    # stdio framing is many small reads/writes; uvloop's libuv loop handles
+    # that with less per-callback overhead than the stdlib selector loop.
+    # The loop and its clock exist before any handler is registered.
+    new_loop = asyncio.new_event_loop
+    if sys.platform != "win32":
+        try:
+            import uvloop
+            new_loop = uvloop.new_event_loop
+        except ImportError:
+            pass
+    loop = new_loop()
+    now = loop.time
+
+    # Tool schemas are static; build them once and serve the same list
+    tool_list = [
+        types.Tool(
+            name="chi_launch_app",
+            description="Launch a desktop application on chiOS",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "app": {"type": "string", "description": "App name (e.g. firefox, kitty, codium)"},
                 },
-            ),
-            types.Tool(
-                name="chi_run_shell",
-                description="Run a shell command on chiOS (30s timeout, user namespace)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "command": {"type": "string", "description": "Shell command"},
-                    },
-                    "required": ["command"],
+                "required": ["app"],
+            },
+        ),
+        types.Tool(
+            name="chi_install_app",
+            description="Install a GUI app via flatpak (immediate) or rpm-ostree (staged)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "App or package name"},
                 },
-            ),
-            types.Tool(
-                name="chi_get_network_status",
-                description="Get current network connection status",
-                inputSchema={"type": "object", "properties": {}},
-            ),
-            types.Tool(
-                name="chi_manage_service",
-                description="Start, stop, restart, or get status of a systemd service",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "service": {"type": "string"},
-                        "action": {"type": "string", "enum": ["start", "stop", "restart", "status"]},
-                    },
-                    "required": ["service", "action"],
+                "required": ["name"],
+            },
+        ),
+        types.Tool(
+            name="chi_install_system",
+            description="Install a system package via rpm-ostree (requires reboot)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "RPM package name"},
                 },
-            ),
-            types.Tool(
-                name="chi_envclone_init",
-                description="Initialize a new dev environment with envclone",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "env_type": {"type": "string", "description": "e.g. python, node, rust"},
-                        "name": {"type": "string", "description": "Project name"},
-                    },
-                    "required": ["env_type", "name"],
+                "required": ["name"],
+            },
+        ),
+        types.Tool(
+            name="chi_remove_app",
+            description="Remove an installed application",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "App or package name"},
                 },
-            ),
-            types.Tool(
-                name="chi_envclone_up",
-                description="Start an envclone dev environment",
-                inputSchema={
-                    "type": "object",
-                    "properties": {"name": {"type": "string"}},
-                    "required": ["name"],
+                "required": ["name"],
+            },
+        ),
+        types.Tool(
+            name="chi_run_shell",
+            description="Run a shell command on chiOS (30s timeout, user namespace)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "command": {"type": "string", "description": "Shell command"},
                 },
-            ),
-            types.Tool(
-                name="chi_envclone_down",
-                description="Stop an envclone dev environment",
-                inputSchema={
-                    "type": "object",
-                    "properties": {"name": {"type": "string"}},
-                    "required": ["name"],
+                "required": ["command"],
+            },
+        ),
+        types.Tool(
+            name="chi_get_network_status",
+            description="Get current network connection status",
+            inputSchema={"type": "object", "properties": {}},
+        ),
+        types.Tool(
+            name="chi_manage_service",
+            description="Start, stop, restart, or get status of a systemd service",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "service": {"type": "string"},
+                    "action": {"type": "string", "enum": ["start", "stop", "restart", "status"]},
                 },
-            ),
-            types.Tool(
-                name="chi_envclone_code",
-                description="Open VSCodium in an envclone dev environment",
-                inputSchema={
-                    "type": "object",
-                    "properties": {"name": {"type": "string"}},
-                    "required": ["name"],
+                "required": ["service", "action"],
+            },
+        ),
+        types.Tool(
+            name="chi_envclone_init",
+            description="Initialize a new dev environment with envclone",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "env_type": {"type": "string", "description": "e.g. python, node, rust"},
+                    "name": {"type": "string", "description": "Project name"},
                 },
-            ),
-        ]
+                "required": ["env_type", "name"],
+            },
+        ),
+        types.Tool(
+            name="chi_envclone_up",
+            description="Start an envclone dev environment",
+            inputSchema={
+                "type": "object",
+                "properties": {"name": {"type": "string"}},
+                "required": ["name"],
+            },
+        ),
+        types.Tool(
+            name="chi_envclone_down",
+            description="Stop an envclone dev environment",
+            inputSchema={
+                "type": "object",
+                "properties": {"name": {"type": "string"}},
+                "required": ["name"],
+            },
+        ),
+        types.Tool(
+            name="chi_envclone_code",
+            description="Open VSCodium in an envclone dev environment",
+            inputSchema={
+                "type": "object",
+                "properties": {"name": {"type": "string"}},
+                "required": ["name"],
+            },
+        ),
+    ]
+
+    @server.list_tools()
+    async def list_tools() -> list[types.Tool]:
+        return tool_list
+
+    # Read-only name -> handler table, built once alongside tool_list
+    dispatch = MappingProxyType({
+        "chi_launch_app": lambda a: launch_app(a["app"]),
+        "chi_install_app": lambda a: install_app(a["name"]),
+        "chi_install_system": lambda a: install_system(a["name"]),
+        "chi_remove_app": lambda a: remove_app(a["name"]),
+        "chi_run_shell": lambda a: run_shell(a["command"]),
+        "chi_get_network_status": lambda a: get_network_status(),
+        "chi_manage_service": lambda a: manage_service(a["service"], a["action"]),
+        "chi_envclone_init": lambda a: envclone_init(a["env_type"], a["name"]),
+        "chi_envclone_up": lambda a: envclone_up(a["name"]),
+        "chi_envclone_down": lambda a: envclone_down(a["name"]),
+        "chi_envclone_code": lambda a: envclone_code(a["name"]),
+    })
 
     @server.call_tool()
     async def call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextContent]:
-        dispatch = {
-            "chi_launch_app": lambda a: launch_app(a["app"]),
-            "chi_install_app": lambda a: install_app(a["name"]),
-            "chi_install_system": lambda a: install_system(a["name"]),
-            "chi_remove_app": lambda a: remove_app(a["name"]),
-            "chi_run_shell": lambda a: run_shell(a["command"]),
-            "chi_get_network_status": lambda a: get_network_status(),
-            "chi_manage_service": lambda a: manage_service(a["service"], a["action"]),
-            "chi_envclone_init": lambda a: envclone_init(a["env_type"], a["name"]),
-            "chi_envclone_up": lambda a: envclone_up(a["name"]),
-            "chi_envclone_down": lambda a: envclone_down(a["name"]),
-            "chi_envclone_code": lambda a: envclone_code(a["name"]),
-        }
-
         handler = dispatch.get(name)
         if not handler:
             result = {"error": f"Unknown tool: {name}"}
         else:
+            t0 = now()
             try:
-                result = handler(arguments)
+                result = await loop.run_in_executor(_POOL, handler, arguments)
             except Exception as e:
                 result = {"error": str(e)}
+            log.debug(f"Tool {name} took {now() - t0:.3f}s")
 
-        text = json.dumps(result) if not isinstance(result, str) else result
+        text = result if isinstance(result, str) else jsonio.dumps(result)
         return [types.TextContent(type="text", text=text)]
 
-    import asyncio
-
     async def _main():
         async with stdio_server() as (read_stream, write_stream):
             await server.run(read_stream, write_stream, server.create_initialization_options())
 
     log.info("MCP server starting on stdio")
-    asyncio.run(_main())
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(_main())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
 
 
 if __name__ == "__main__":
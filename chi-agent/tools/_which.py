@@ -0,0 +1,22 @@
+"""
+Cached PATH lookups for the system binaries the tools shell out to.
+
+flatpak, rpm-ostree, nmcli, hyprctl, gtk-launch and envclone ship with the
+image and don't move while the agent runs, so each is resolved once.
+Misses aren't cached: a tool installed after the agent starts is found on
+the next lookup.
+"""
+
+import shutil
+
+_FOUND: dict[str, str] = {}
+
+
+def which(name: str) -> str | None:
+    """shutil.which(), memoized per binary name once it resolves."""
+    path = _FOUND.get(name)
+    if path is None:
+        path = shutil.which(name)
+        if path is not None:
+            _FOUND[name] = path
+    return path
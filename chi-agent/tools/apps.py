@@ -6,9 +6,19 @@ Launches desktop applications via:
 2. xdg-open fallback for files/URLs
 """
 
+import functools
+import logging
+import os
+import selectors
 import subprocess
 import shutil
+import threading
 from pathlib import Path
+from types import MappingProxyType
+
+from ._which import which
+
+log = logging.getLogger("chi-agent.apps")
 
 
 # Map friendly names to actual binary/desktop entry names
@@ -24,47 +34,166 @@ APP_ALIASES = {
     "file manager": "nautilus",
 }
 
+# Read-only, lowercase-keyed view used for lookups
+_APP_ALIASES_LC = MappingProxyType({k.lower(): v for k, v in APP_ALIASES.items()})
+
+
+SEARCH_DIRS = (
+    Path("/usr/share/applications"),
+    Path("/usr/local/share/applications"),
+    Path.home() / ".local/share/applications",
+)
+
+
+def _dir_mtimes() -> tuple[int | None, ...]:
+    """mtime of each search dir (None if missing); changes when entries do."""
+    mtimes = []
+    for d in SEARCH_DIRS:
+        try:
+            mtimes.append(os.stat(d).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def _trigrams(s: str) -> set[str]:
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+@functools.lru_cache(maxsize=1)
+def _desktop_index(
+    mtimes: tuple[int | None, ...],
+) -> tuple[tuple[tuple[str, str], ...], dict[str, set[int]]]:
+    """
+    Index .desktop entries as (ordered (lowercase stem, stem) pairs,
+    trigram -> positions in ordered). Rebuilt only when a dir's mtime changes.
+    """
+    seen: set[str] = set()
+    ordered: list[tuple[str, str]] = []
+    for d in SEARCH_DIRS:
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.name.endswith(".desktop"):
+                        stem = e.name[:-8]
+                        key = stem.lower()
+                        if key not in seen:
+                            seen.add(key)
+                            ordered.append((key, stem))
+        except OSError:
+            continue
+
+    trigrams: dict[str, set[int]] = {}
+    for pos, (key, _stem) in enumerate(ordered):
+        for tri in _trigrams(key):
+            trigrams.setdefault(tri, set()).add(pos)
+    return tuple(ordered), trigrams
+
 
 def _find_desktop_entry(app: str) -> str | None:
     """Search XDG application dirs for a .desktop entry matching app name."""
-    search_dirs = [
-        Path("/usr/share/applications"),
-        Path("/usr/local/share/applications"),
-        Path.home() / ".local/share/applications",
-    ]
+    ordered, trigrams = _desktop_index(_dir_mtimes())
     app_lower = app.lower()
-    for d in search_dirs:
-        if not d.exists():
-            continue
-        for entry in d.glob("*.desktop"):
-            if app_lower in entry.stem.lower():
-                return entry.stem
+
+    if len(app_lower) < 3:
+        candidates = range(len(ordered))
+    else:
+        # Every entry containing app_lower has all of its trigrams
+        postings = sorted((trigrams.get(t, set()) for t in _trigrams(app_lower)), key=len)
+        candidates = sorted(set.intersection(*postings))
+
+    # Confirm in directory order so the first substring match wins, as the
+    # original glob scan did (an exact stem gets no priority over it)
+    for pos in candidates:
+        key, stem = ordered[pos]
+        if app_lower in key:
+            return stem
     return None
 
 
+# stdin/stdout/stderr of launched apps all point at /dev/null
+_DEVNULL_ACTIONS = [
+    (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+    (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+    (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+] if hasattr(os, "posix_spawn") else []
+
+
+# One thread reaps every app we launch: it waits on a pidfd per child
+# instead of parking a thread in waitpid() for each app's lifetime
+_reaper_sel: selectors.DefaultSelector | None = None
+_reaper_lock = threading.Lock()
+
+
+def _reaper_loop() -> None:
+    while True:
+        for key, _ in _reaper_sel.select():
+            with _reaper_lock:
+                _reaper_sel.unregister(key.fd)
+            os.close(key.fd)
+            try:
+                os.waitpid(key.data, 0)
+            except ChildProcessError:
+                pass
+
+
+def _reap_later(pid: int) -> None:
+    """Collect pid's exit status on the shared reaper thread."""
+    global _reaper_sel
+    try:
+        fd = os.pidfd_open(pid)
+    except (AttributeError, OSError) as e:
+        # No pidfds here (old kernel, ENOSYS, seccomp): the app is already
+        # running, so fall back to a thread that waits on just this child
+        log.debug(f"pidfd_open({pid}) failed, reaping with a waitpid thread: {e}")
+        threading.Thread(target=os.waitpid, args=(pid, 0), daemon=True).start()
+        return
+    with _reaper_lock:
+        if _reaper_sel is None:
+            _reaper_sel = selectors.DefaultSelector()
+            threading.Thread(target=_reaper_loop, name="chi-app-reaper", daemon=True).start()
+        # epoll picks up fds registered while another thread is in select()
+        _reaper_sel.register(fd, selectors.EVENT_READ, pid)
+
+
+def _spawn_detached(argv: list[str]) -> None:
+    """
+    Start argv in its own session without waiting for it. Uses posix_spawn,
+    which skips fork()'s copy of the agent's page tables.
+    """
+    if not _DEVNULL_ACTIONS:
+        subprocess.Popen(
+            argv,
+            start_new_session=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return
+
+    pid = os.posix_spawn(argv[0], argv, os.environ, file_actions=_DEVNULL_ACTIONS, setsid=True)
+    # Reap the child when it exits so it doesn't linger as a zombie
+    _reap_later(pid)
+
+
 def launch_app(app: str) -> dict:
     """
     Launch an application. Returns {"status": "launched", "app": name} or {"error": ...}.
     """
     # Resolve alias
-    resolved = APP_ALIASES.get(app.lower(), app)
+    resolved = _APP_ALIASES_LC.get(app.lower(), app)
 
     # Try direct binary first
     binary = shutil.which(resolved)
     if binary:
         try:
-            subprocess.Popen(
-                [binary],
-                start_new_session=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
+            _spawn_detached([binary])
             return {"status": "launched", "app": resolved, "method": "binary"}
         except Exception as e:
             return {"error": f"Failed to launch {resolved}: {e}"}
 
     # Try via Hyprland IPC (dispatch exec)
-    hyprctl = shutil.which("hyprctl")
+    hyprctl = which("hyprctl")
     if hyprctl:
         try:
             result = subprocess.run(
@@ -81,15 +210,10 @@ def launch_app(app: str) -> dict:
     # Try desktop entry via xdg-open / gtk-launch
     entry = _find_desktop_entry(resolved)
     if entry:
-        gtk_launch = shutil.which("gtk-launch")
+        gtk_launch = which("gtk-launch")
         if gtk_launch:
             try:
-                subprocess.Popen(
-                    [gtk_launch, entry],
-                    start_new_session=True,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                )
+                _spawn_detached([gtk_launch, entry])
                 return {"status": "launched", "app": entry, "method": "gtk-launch"}
             except Exception as e:
                 return {"error": f"gtk-launch failed: {e}"}
@@ -8,13 +8,14 @@ Docs: https://github.com/matoval/envclone
 """
 
 import subprocess
-import shutil
 from typing import Any
 
+from ._which import which
+
 
 def _envclone(*args: str, timeout: int = 60) -> dict[str, Any]:
     """Run envclone with given args."""
-    binary = shutil.which("envclone")
+    binary = which("envclone")
     if not binary:
         return {"error": "envclone not installed. Expected at /usr/local/bin/envclone"}
 
@@ -10,13 +10,18 @@ Safety: rpm-ostree changes always note "reboot required".
 """
 
 import subprocess
-import shutil
+from types import MappingProxyType
 from typing import Any
 
+from ._which import which
+
 
 # Flatpak remote to use
 FLATPAK_REMOTE = "flathub"
 
+# Remotes already confirmed registered by remote-add
+_REMOTE_READY: set[str] = set()
+
 # Known flatpak app IDs for common names
 FLATPAK_IDS = {
     "firefox": "org.mozilla.firefox",
@@ -36,6 +41,9 @@ FLATPAK_IDS = {
     "blender": "org.blender.Blender",
 }
 
+# Read-only, lowercase-keyed view used for lookups
+_FLATPAK_IDS_LC = MappingProxyType({k.lower(): v for k, v in FLATPAK_IDS.items()})
+
 
 def _run(cmd: list[str], timeout: int = 120) -> tuple[int, str, str]:
     result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
@@ -44,15 +52,18 @@ def _run(cmd: list[str], timeout: int = 120) -> tuple[int, str, str]:
 
 def _flatpak_install(name: str) -> dict[str, Any]:
     """Try to install via flatpak. Returns result dict."""
-    if not shutil.which("flatpak"):
+    if not which("flatpak"):
         return {"error": "flatpak not available"}
 
     # Resolve app ID
-    app_id = FLATPAK_IDS.get(name.lower(), name)
+    app_id = _FLATPAK_IDS_LC.get(name.lower(), name)
 
-    # Ensure flathub remote exists
-    _run(["flatpak", "remote-add", "--if-not-exists", "--user",
-          FLATPAK_REMOTE, "https://dl.flathub.org/repo/flathub.flatpakrepo"])
+    # Ensure flathub remote exists (once per process, after it succeeds)
+    if FLATPAK_REMOTE not in _REMOTE_READY:
+        rc, _, _ = _run(["flatpak", "remote-add", "--if-not-exists", "--user",
+                         FLATPAK_REMOTE, "https://dl.flathub.org/repo/flathub.flatpakrepo"])
+        if rc == 0:
+            _REMOTE_READY.add(FLATPAK_REMOTE)
 
     rc, out, err = _run(
         ["flatpak", "install", "--user", "--noninteractive", FLATPAK_REMOTE, app_id],
@@ -65,7 +76,7 @@ def _flatpak_install(name: str) -> dict[str, Any]:
 
 def _rpm_ostree_install(name: str) -> dict[str, Any]:
     """Install via rpm-ostree. Staged — requires reboot."""
-    if not shutil.which("rpm-ostree"):
+    if not which("rpm-ostree"):
         return {"error": "rpm-ostree not available"}
 
     rc, out, err = _run(
@@ -120,10 +131,10 @@ def remove_app(name: str) -> dict[str, Any]:
     Remove an application.
     Tries flatpak uninstall first, then rpm-ostree override remove.
     """
-    app_id = FLATPAK_IDS.get(name.lower(), name)
+    app_id = _FLATPAK_IDS_LC.get(name.lower(), name)
 
     # Try flatpak
-    if shutil.which("flatpak"):
+    if which("flatpak"):
         rc, out, err = _run(
             ["flatpak", "uninstall", "--user", "--noninteractive", app_id],
             timeout=120,
@@ -132,7 +143,7 @@ def remove_app(name: str) -> dict[str, Any]:
             return {"status": "removed", "name": name, "method": "flatpak"}
 
     # Try rpm-ostree override remove (for layered packages)
-    if shutil.which("rpm-ostree"):
+    if which("rpm-ostree"):
         rc, out, err = _run(
             ["rpm-ostree", "override", "remove", name],
             timeout=120,
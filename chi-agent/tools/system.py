@@ -8,11 +8,23 @@ System management via:
 
 import logging
 import subprocess
-import shutil
+import time
 from typing import Any
 
+from ._which import which
+
 log = logging.getLogger("chi-agent.system")
 
+# NetworkManager NMState values
+STATE_MAP = {
+    20: "disconnected",
+    30: "disconnected",
+    40: "connecting",
+    50: "connected_local",
+    60: "connected_site",
+    70: "connected_global",
+}
+
 
 def get_network_status() -> dict[str, Any]:
     """Return current network connections and state."""
@@ -23,15 +35,6 @@ def get_network_status() -> dict[str, Any]:
         nm = bus.get("org.freedesktop.NetworkManager")
         state = nm.State
 
-        STATE_MAP = {
-            20: "disconnected",
-            30: "disconnected",
-            40: "connecting",
-            50: "connected_local",
-            60: "connected_site",
-            70: "connected_global",
-        }
-
         connections = []
         for ac_path in nm.ActiveConnections:
             try:
@@ -55,23 +58,23 @@ def get_network_status() -> dict[str, Any]:
 
 def _nmcli_status() -> dict[str, Any]:
     """Fallback: parse nmcli output."""
-    if not shutil.which("nmcli"):
+    if not which("nmcli"):
         return {"error": "NetworkManager not available"}
     result = subprocess.run(
-        ["nmcli", "-t", "connection", "show", "--active"],
+        ["nmcli", "-t", "-f", "NAME,TYPE", "connection", "show", "--active"],
         capture_output=True, text=True, timeout=5,
     )
     connections = []
     for line in result.stdout.splitlines():
-        parts = line.split(":")
-        if len(parts) >= 2:
-            connections.append({"id": parts[0], "type": parts[2] if len(parts) > 2 else "unknown"})
+        name, sep, typ = line.partition(":")
+        if sep and name:
+            connections.append({"id": name, "type": typ or "unknown"})
     return {"active_connections": connections}
 
 
 def set_network(connection: str, enable: bool) -> dict[str, Any]:
     """Enable or disable a NetworkManager connection."""
-    if not shutil.which("nmcli"):
+    if not which("nmcli"):
         return {"error": "nmcli not available"}
 
     action = "up" if enable else "down"
@@ -84,11 +87,94 @@ def set_network(connection: str, enable: bool) -> dict[str, Any]:
     return {"error": result.stderr.strip() or result.stdout.strip()}
 
 
+# systemd Manager methods for each job-queuing action
+SYSTEMD_METHODS = {
+    "start": "StartUnit",
+    "stop": "StopUnit",
+    "restart": "RestartUnit",
+}
+
+# systemctl asks polkit for interactive authorization; a bare D-Bus call
+# gets one of these back instead, so those cases go through systemctl
+_AUTH_ERRORS = (
+    "org.freedesktop.DBus.Error.AccessDenied",
+    "org.freedesktop.DBus.Error.InteractiveAuthorizationRequired",
+)
+
+
+def _unit_status_text(unit_name: str, unit) -> str:
+    """The header of `systemctl status` (journal lines aren't included)."""
+    lines = [f"{unit_name} - {unit.Description}"]
+    loaded = unit.LoadState
+    extras = [x for x in (unit.FragmentPath, unit.UnitFileState) if x]
+    if extras:
+        loaded += f" ({'; '.join(extras)})"
+    lines.append(f"     Loaded: {loaded}")
+    lines.append(f"     Active: {unit.ActiveState} ({unit.SubState})")
+    main_pid = getattr(unit, "MainPID", 0)
+    if main_pid:
+        lines.append(f"   Main PID: {main_pid}")
+    return "\n".join(lines)
+
+
+def _systemd_dbus(
+    bus, scope: str, service_unit: str, action: str, timeout: int = 30,
+) -> dict[str, Any] | None:
+    """
+    Run action on service_unit through systemd's D-Bus Manager.
+    Returns a result dict, or None if the unit can't be managed in this scope.
+    """
+    mgr = bus.get(".systemd1")
+
+    if action == "status":
+        unit = bus.get(".systemd1", mgr.LoadUnit(service_unit))
+        if unit.LoadState == "not-found":
+            return None
+        return {"service": service_unit, "status": _unit_status_text(service_unit, unit), "scope": scope}
+
+    try:
+        job = getattr(mgr, SYSTEMD_METHODS[action])(service_unit, "replace")
+    except Exception as e:
+        if any(name in str(e) for name in _AUTH_ERRORS):
+            return _systemctl(scope, service_unit, action)
+        log.debug(f"{SYSTEMD_METHODS[action]}({service_unit}) failed on {scope} bus: {e}")
+        return None
+
+    # Wait for the job to finish, as systemctl does
+    deadline = time.monotonic() + timeout
+    while any(j[4] == job for j in mgr.ListJobs()):
+        if time.monotonic() > deadline:
+            return {"error": f"Timed out waiting for {action} of {service_unit}", "scope": scope}
+        time.sleep(0.05)
+
+    # LoadUnit rather than GetUnit: a stopped unit may already be unloaded
+    state = bus.get(".systemd1", mgr.LoadUnit(service_unit)).ActiveState
+    if action != "stop" and state == "failed":
+        return None
+    return {"status": "success", "service": service_unit, "action": action, "scope": scope, "state": state}
+
+
+def _systemctl(scope: str, service_unit: str, action: str) -> dict[str, Any] | None:
+    """Fallback: run systemctl. Returns a result dict, or None on failure."""
+    result = subprocess.run(
+        ["systemctl", scope, action, service_unit],
+        capture_output=True, text=True, timeout=30,
+    )
+    if result.returncode != 0:
+        return None
+    output = result.stdout.strip()
+    if action == "status":
+        return {"service": service_unit, "status": output, "scope": scope}
+    return {"status": "success", "service": service_unit, "action": action, "scope": scope}
+
+
 def manage_service(service: str, action: str) -> dict[str, Any]:
     """
     Manage systemd services.
     action: "start" | "stop" | "restart" | "status"
     Tries user units first, falls back to system units.
+    "status" reports the `systemctl status` header (unit, Loaded, Active,
+    Main PID) without the trailing journal lines.
     """
     if action not in ("start", "stop", "restart", "status"):
         return {"error": f"Invalid action: {action}"}
@@ -99,17 +185,18 @@ def manage_service(service: str, action: str) -> dict[str, Any]:
     else:
         service_unit = service
 
-    # Try user unit first
+    # Try user unit first; talk to systemd directly, systemctl if the bus is unavailable
     for scope in ("--user", "--system"):
-        cmd = ["systemctl", scope, action, service_unit]
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=30,
-        )
-        if result.returncode == 0:
-            output = result.stdout.strip()
-            if action == "status":
-                return {"service": service_unit, "status": output, "scope": scope}
-            return {"status": "success", "service": service_unit, "action": action, "scope": scope}
+        try:
+            from pydbus import SessionBus, SystemBus
+
+            bus = SessionBus() if scope == "--user" else SystemBus()
+            result = _systemd_dbus(bus, scope, service_unit, action)
+        except Exception as e:
+            log.warning(f"D-Bus systemd unavailable ({scope}), falling back to systemctl: {e}")
+            result = _systemctl(scope, service_unit, action)
+        if result:
+            return result
 
     # Both failed — return combined error
     return {
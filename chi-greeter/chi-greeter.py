@@ -7,24 +7,46 @@ Must be launched inside a Wayland compositor (e.g. cage):
     greetd config: command = "cage -s -- chi-greeter"
 """
 
-import json
 import os
 import pwd
 import socket
-import subprocess
 import sys
 import threading
-from datetime import datetime
+import time
 from pathlib import Path
 
 import gi
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gdk, GLib, Gio, Gtk
 
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
 GREETD_SOCK = os.environ.get("GREETD_SOCK", "")
+GREETD_SOCK_BUF = 262144
 SESSION_CMD = ["labwc"]
 CSS_FILE = "/usr/share/chi-greeter/chi-greeter.css"
 
+# Clock label and date label formats, joined by \x1f
+_CLOCK_FMT = "%-I:%M %p\x1f%A, %B %-d %Y"
+
+# Session environment; {uid} is filled in per user
+_ENV_TEMPLATE = (
+    "XDG_SESSION_TYPE=wayland",
+    "XDG_RUNTIME_DIR=/run/user/{uid}",
+    "GDK_BACKEND=wayland",
+    "MOZ_ENABLE_WAYLAND=1",
+)
+
 
 # ---------------------------------------------------------------------------
 # greetd IPC client
@@ -36,22 +58,47 @@ class GreetdClient:
     def __init__(self, sock_path: str):
         self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         self._sock.connect(sock_path)
+        # Roomy kernel buffers so a PAM exchange never stalls on a full
+        # socket; UDS has no Nagle, and _send already writes in one sendmsg
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, GREETD_SOCK_BUF)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, GREETD_SOCK_BUF)
+        self._rxbuf = bytearray(4096)
 
     def _send(self, msg: dict) -> dict:
-        data = json.dumps(msg).encode()
-        self._sock.sendall(len(data).to_bytes(4, "little") + data)
-        raw_len = self._recv_exact(4)
-        length = int.from_bytes(raw_len, "little")
-        return json.loads(self._recv_exact(length))
+        data = _dumps(msg)
+        hdr = len(data).to_bytes(4, "little")
+        # Header and payload go out in one syscall, without concatenating
+        sent = self._sock.sendmsg([hdr, data])
+        if sent < len(hdr) + len(data):
+            self._sock.sendall((hdr + data)[sent:])
+        return self._recv_reply()
+
+    def _recv_reply(self) -> dict:
+        # One recv usually holds the length prefix and the whole reply;
+        # greetd answers one request at a time, so nothing else is queued
+        mv = memoryview(self._rxbuf)
+        got = 0
+        while got < 4:
+            n = self._sock.recv_into(mv[got:])
+            if not n:
+                raise ConnectionError("greetd closed the connection")
+            got += n
+        length = int.from_bytes(mv[:4], "little")
+        if got - 4 >= length:
+            return _loads(bytes(mv[4:4 + length]))
+        return _loads(bytes(mv[4:got]) + self._recv_exact(length - (got - 4)))
 
     def _recv_exact(self, n: int) -> bytes:
-        buf = b""
-        while len(buf) < n:
-            chunk = self._sock.recv(n - len(buf))
-            if not chunk:
+        # Read straight into one preallocated buffer; no per-chunk copies
+        buf = bytearray(n)
+        mv = memoryview(buf)
+        off = 0
+        while off < n:
+            got = self._sock.recv_into(mv[off:], n - off)
+            if not got:
                 raise ConnectionError("greetd closed the connection")
-            buf += chunk
-        return buf
+            off += got
+        return bytes(buf)
 
     def create_session(self, username: str) -> dict:
         return self._send({"type": "create_session", "username": username})
@@ -80,9 +127,13 @@ class ChiGreeter(Gtk.ApplicationWindow):
         self.fullscreen()
 
         self._auth_pending = False
+        # One greetd connection, kept across login attempts
+        self._client: GreetdClient | None = None
+        self._pw_cache: dict[str, int] = {}
+        self._env_cache: dict[int, list[str]] = {}
+        self._last_clock: str | None = None
         self._build_ui()
         self._update_clock()
-        GLib.timeout_add(1000, self._update_clock)
 
     def _build_ui(self) -> None:
         overlay = Gtk.Overlay()
@@ -178,19 +229,32 @@ class ChiGreeter(Gtk.ApplicationWindow):
 
         shutdown_btn = Gtk.Button(label="⏻  Shutdown")
         shutdown_btn.set_name("power-btn")
-        shutdown_btn.connect("clicked", lambda _: subprocess.run(["loginctl", "poweroff"]))
+        shutdown_btn.connect("clicked", lambda _: self._spawn(["loginctl", "poweroff"]))
         power_box.append(shutdown_btn)
 
         restart_btn = Gtk.Button(label="↺  Restart")
         restart_btn.set_name("power-btn")
-        restart_btn.connect("clicked", lambda _: subprocess.run(["loginctl", "reboot"]))
+        restart_btn.connect("clicked", lambda _: self._spawn(["loginctl", "reboot"]))
         power_box.append(restart_btn)
 
+    def _spawn(self, argv: list[str]) -> None:
+        # Non-blocking spawn: the UI keeps running while loginctl works
+        try:
+            Gio.Subprocess.new(argv, Gio.SubprocessFlags.NONE)
+        except GLib.Error as e:
+            self._show_error(f"{argv[0]} failed: {e.message}")
+
     def _update_clock(self) -> bool:
-        now = datetime.now()
-        self._clock_lbl.set_text(now.strftime("%-I:%M %p"))
-        self._date_lbl.set_text(now.strftime("%A, %B %-d %Y"))
-        return True
+        tm = time.localtime()
+        # One strftime for both labels, split on the unit separator
+        clock, date = time.strftime(_CLOCK_FMT, tm).split("\x1f")
+        if clock != self._last_clock:
+            self._last_clock = clock
+            self._clock_lbl.set_text(clock)
+            self._date_lbl.set_text(date)
+        # Only minutes are shown: wake once, at the next minute boundary
+        GLib.timeout_add_seconds(60 - tm.tm_sec, self._update_clock)
+        return False
 
     def _on_login(self, *_) -> None:
         if self._auth_pending:
@@ -211,32 +275,26 @@ class ChiGreeter(Gtk.ApplicationWindow):
             GLib.idle_add(self._show_error, "greetd socket not found (GREETD_SOCK unset)")
             return
         try:
-            client = GreetdClient(GREETD_SOCK)
+            if self._client is None:
+                self._client = GreetdClient(GREETD_SOCK)
+            client = self._client
             resp = client.create_session(username)
 
-            # Walk through PAM auth messages
+            # Walk through PAM auth messages; info/error prompts get None
+            responders = {"secret": password, "visible": username}
             while resp.get("type") == "auth_message":
-                msg_type = resp.get("auth_message_type", "")
-                if msg_type == "secret":
-                    resp = client.post_auth_message_response(password)
-                elif msg_type == "visible":
-                    resp = client.post_auth_message_response(username)
-                else:
-                    resp = client.post_auth_message_response(None)
+                resp = client.post_auth_message_response(
+                    responders.get(resp.get("auth_message_type"))
+                )
 
             if resp.get("type") == "success":
-                try:
-                    uid = pwd.getpwnam(username).pw_uid
-                except KeyError:
-                    uid = 1000
-                env = [
-                    "XDG_SESSION_TYPE=wayland",
-                    f"XDG_RUNTIME_DIR=/run/user/{uid}",
-                    "GDK_BACKEND=wayland",
-                    "MOZ_ENABLE_WAYLAND=1",
-                ]
-                resp2 = client.start_session(SESSION_CMD, env)
-                if resp2.get("type") != "success":
+                resp2 = client.start_session(SESSION_CMD, self._session_env(username))
+                if resp2.get("type") == "success":
+                    client.close()
+                    self._client = None
+                else:
+                    # Free the session so the next attempt can create one
+                    client.cancel_session()
                     GLib.idle_add(
                         self._show_error,
                         resp2.get("description", "Failed to start session"),
@@ -244,11 +302,25 @@ class ChiGreeter(Gtk.ApplicationWindow):
             else:
                 client.cancel_session()
                 GLib.idle_add(self._show_error, "Incorrect username or password.")
-
-            client.close()
         except Exception as e:
+            # Socket or framing is in an unknown state: reconnect next attempt
+            if self._client is not None:
+                self._client.close()
+                self._client = None
             GLib.idle_add(self._show_error, str(e))
 
+    def _session_env(self, username: str) -> list[str]:
+        uid = self._pw_cache.get(username)
+        if uid is None:
+            try:
+                uid = self._pw_cache.setdefault(username, pwd.getpwnam(username).pw_uid)
+            except KeyError:
+                uid = 1000
+        env = self._env_cache.get(uid)
+        if env is None:
+            env = self._env_cache[uid] = [e.format(uid=uid) for e in _ENV_TEMPLATE]
+        return env
+
     def _show_error(self, msg: str) -> None:
         self._error_lbl.set_text(msg)
         self._pass_entry.set_text("")
@@ -267,7 +339,8 @@ class ChiGreeterApp(Gtk.Application):
             flags=Gio.ApplicationFlags.FLAGS_NONE,
         )
 
-    def do_activate(self):
+    def do_startup(self):
+        Gtk.Application.do_startup(self)
         css = Gtk.CssProvider()
         css_path = Path(CSS_FILE)
         if css_path.exists():
@@ -277,6 +350,8 @@ class ChiGreeterApp(Gtk.Application):
             css,
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
         )
+
+    def do_activate(self):
         win = ChiGreeter(self)
         win.present()
 
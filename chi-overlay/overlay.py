@@ -9,49 +9,171 @@ Launched by chi-shell panel button or Super+Space keybinding.
 Second launch activates (shows) the already-running instance.
 """
 
-import json
+import os
 import sys
-import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import gi
+from gi.repository import GLib, Gio
+
+APP_ID = "io.chios.Overlay"
+APP_PATH = "/io/chios/Overlay"
+
+
+def _activate_running() -> bool:
+    """
+    Activate an already-running overlay over D-Bus. Returns False if no
+    instance owns APP_ID.
+    """
+    platform_data = {}
+    token = os.environ.get("XDG_ACTIVATION_TOKEN")
+    if token:
+        platform_data["activation-token"] = GLib.Variant("s", token)
+    try:
+        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        bus.call_sync(
+            APP_ID, APP_PATH, "org.freedesktop.Application", "Activate",
+            GLib.Variant("(a{sv})", (platform_data,)), None,
+            Gio.DBusCallFlags.NO_AUTO_START, 1000, None,
+        )
+    except GLib.Error:
+        return False
+    return True
+
+
+# Super+Space while the overlay is running: hand off to that instance
+# before paying for the GTK import, which dominates startup time
+if __name__ == "__main__" and _activate_running():
+    sys.exit(0)
+
 gi.require_version("Gtk", "4.0")
 gi.require_version("Gdk", "4.0")
-from gi.repository import Gdk, GLib, Gio, Gtk
+from gi.repository import Gdk, GObject, Gtk
+
+try:
+    from pydbus import SessionBus
+except ImportError:
+    SessionBus = None
+
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _pretty(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    import json
+    _loads = json.loads
+
+    def _pretty(obj) -> str:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
 
 DBUS_AGENT = "io.chios.Agent"
 DBUS_AGENT_PATH = "/io/chios/Agent"
 CSS_FILE = "/usr/lib/chi-overlay/overlay.css"
 WINDOW_WIDTH = 720
 WINDOW_HEIGHT = 540
+HISTORY_PAGE_SIZE = 10  # conversations fetched per GetHistoryPage call
+ASK_TIMEOUT_MS = 10 * 60 * 1000  # Ask blocks until the agent finishes, tool calls included
+
+# Rounded corners, shadows and transitions are cheap on the GL/Vulkan
+# renderers but expensive under the cairo (software) fallback
+SOFTWARE_CSS = "* { border-radius: 0; box-shadow: none; transition: none; }"
+
+
+def _software_rendering(window: Gtk.Window) -> bool:
+    """True when the window is painted by GSK's cairo renderer or software GL."""
+    if os.environ.get("GSK_RENDERER") == "cairo" or os.environ.get("LIBGL_ALWAYS_SOFTWARE") == "1":
+        return True
+    renderer = window.get_renderer()
+    return renderer is not None and renderer.__gtype__.name == "GskCairoRenderer"
+
+
+# ---------------------------------------------------------------------------
+# Shared chi-agent proxy
+# ---------------------------------------------------------------------------
+
+_AGENT = None
+
+
+def get_agent():
+    """Return the io.chios.Agent proxy shared by all tabs, creating it on first use."""
+    global _AGENT
+    if _AGENT is None:
+        if SessionBus is None:
+            raise RuntimeError("pydbus not installed")
+        _AGENT = SessionBus().get(DBUS_AGENT, DBUS_AGENT_PATH)
+    return _AGENT
+
+
+def drop_agent() -> None:
+    """Forget the cached proxy after a failed call so the next one reconnects."""
+    global _AGENT
+    _AGENT = None
+
+
+def _submit(fn, *args) -> None:
+    """Run fn(*args) on the overlay app's shared worker pool."""
+    Gio.Application.get_default().submit(fn, *args)
 
 
 # ---------------------------------------------------------------------------
 # Chat message row
 # ---------------------------------------------------------------------------
 
-class MessageRow(Gtk.Box):
+class MessageItem(GObject.Object):
+    """One chat message in ChatTab's list model."""
+
     def __init__(self, role: str, content: str):
+        super().__init__()
+        self.role = role
+        self.content = content
+
+
+class MessageRow(Gtk.Box):
+    # role -> (speaker label, CSS class)
+    _ROLE_META = {
+        "user": ("You", "msg-user"),
+        "assistant": ("chi", "msg-assistant"),
+    }
+    _DEFAULT_META = _ROLE_META["assistant"]
+
+    def __init__(self, role: str = "assistant", content: str = ""):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=2)
         self.set_margin_start(12)
         self.set_margin_end(12)
         self.set_margin_top(4)
         self.set_margin_bottom(4)
         self.add_css_class("msg-row")
-        self.add_css_class(f"msg-{role}")
-
-        who = Gtk.Label(label="You" if role == "user" else "chi")
-        who.set_xalign(0)
-        who.add_css_class("msg-who")
-        self.append(who)
-
-        text = Gtk.Label(label=content)
-        text.set_xalign(0)
-        text.set_wrap(True)
-        text.set_wrap_mode(2)  # WORD_CHAR
-        text.set_selectable(True)
-        text.add_css_class("msg-text")
-        self.append(text)
+        self._css: str | None = None
+
+        self._who = Gtk.Label()
+        self._who.set_xalign(0)
+        self._who.add_css_class("msg-who")
+        self.append(self._who)
+
+        self._text = Gtk.Label()
+        self._text.set_xalign(0)
+        self._text.set_wrap(True)
+        self._text.set_wrap_mode(2)  # WORD_CHAR
+        self._text.set_selectable(True)
+        self._text.add_css_class("msg-text")
+        self.append(self._text)
+
+        self.set_message(role, content)
+
+    def set_message(self, role: str, content: str) -> None:
+        """(Re)fill the row; ListView recycles rows across messages."""
+        label, css = self._ROLE_META.get(role, self._DEFAULT_META)
+        if css != self._css:
+            if self._css is not None:
+                self.remove_css_class(self._css)
+            self.add_css_class(css)
+            self._who.set_label(label)
+            self._css = css
+        self._text.set_label(content)
 
 
 # ---------------------------------------------------------------------------
@@ -69,7 +191,15 @@ class ChatTab(Gtk.Box):
         scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         self.append(scroll)
 
-        self._msg_list = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+        # ListView only realizes rows near the viewport, so a long chat
+        # doesn't cost O(messages) layout on every scroll or resize
+        self._messages = Gio.ListStore.new(MessageItem)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._setup_row)
+        factory.connect("bind", self._bind_row)
+        self._msg_list = Gtk.ListView(
+            model=Gtk.NoSelection(model=self._messages), factory=factory,
+        )
         self._msg_list.set_name("msg-list")
         scroll.set_child(self._msg_list)
         self._scroll = scroll
@@ -117,20 +247,37 @@ class ChatTab(Gtk.Box):
         self._thinking.set_visible(False)
         self.append(self._thinking)
 
-        self._agent = None
+        # Ask goes through a Gio proxy: the call and its reply both live on
+        # the main loop, and the proxy follows the agent across restarts
+        self._agent_proxy: Gio.DBusProxy | None = None
+        Gio.DBusProxy.new_for_bus(
+            Gio.BusType.SESSION, Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES, None,
+            DBUS_AGENT, DBUS_AGENT_PATH, DBUS_AGENT, None, self._on_proxy_ready,
+        )
 
     def focus_entry(self) -> None:
         self._entry.grab_focus()
 
     def add_message(self, role: str, content: str) -> None:
-        row = MessageRow(role, content)
-        self._msg_list.append(row)
+        self._messages.append(MessageItem(role, content))
         # Scroll to bottom after GTK finishes layout
         GLib.idle_add(self._scroll_bottom)
 
+    def _setup_row(self, _factory, list_item) -> None:
+        list_item.set_activatable(False)
+        list_item.set_child(MessageRow())
+
+    def _bind_row(self, _factory, list_item) -> None:
+        msg = list_item.get_item()
+        list_item.get_child().set_message(msg.role, msg.content)
+
     def _scroll_bottom(self) -> bool:
-        adj = self._scroll.get_vadjustment()
-        adj.set_value(adj.get_upper())
+        n = self._messages.get_n_items()
+        if n and hasattr(self._msg_list, "scroll_to"):  # GTK >= 4.12
+            self._msg_list.scroll_to(n - 1, Gtk.ListScrollFlags.NONE, None)
+        else:
+            adj = self._scroll.get_vadjustment()
+            adj.set_value(adj.get_upper())
         return False
 
     def _on_submit(self, *_) -> None:
@@ -142,18 +289,38 @@ class ChatTab(Gtk.Box):
         self._thinking.set_visible(True)
         self.add_message("user", prompt)
 
-        threading.Thread(target=self._ask, args=(prompt,), daemon=True).start()
+        self._ask(prompt)
+
+    def _on_proxy_ready(self, _source, result) -> None:
+        try:
+            self._agent_proxy = Gio.DBusProxy.new_for_bus_finish(result)
+        except GLib.Error as e:
+            print(f"[chi-overlay] agent proxy unavailable: {e.message}")
+            return
+        self._agent_proxy.connect("notify::g-name-owner", self._on_agent_owner_changed)
+
+    def _on_agent_owner_changed(self, _proxy, _pspec) -> None:
+        # The agent restarted or exited: make the pydbus proxy the other
+        # tabs share reconnect on its next use
+        drop_agent()
 
     def _ask(self, prompt: str) -> None:
-        agent = self._get_agent()
-        if agent is None:
-            GLib.idle_add(self._on_response, None, "chi-agent is not running.")
+        proxy = self._agent_proxy
+        if proxy is None or proxy.get_name_owner() is None:
+            self._on_response(None, "chi-agent is not running.")
             return
+        proxy.call(
+            "Ask", GLib.Variant("(s)", (prompt,)), Gio.DBusCallFlags.NONE,
+            ASK_TIMEOUT_MS, None, self._on_ask_done,
+        )
+
+    def _on_ask_done(self, proxy, result) -> None:
         try:
-            response = agent.Ask(prompt)
-            GLib.idle_add(self._on_response, response, None)
-        except Exception as e:
-            GLib.idle_add(self._on_response, None, str(e))
+            response = proxy.call_finish(result).unpack()[0]
+        except GLib.Error as e:
+            self._on_response(None, e.message)
+            return
+        self._on_response(response, None)
 
     def _on_response(self, response: str | None, error: str | None) -> None:
         self._thinking.set_visible(False)
@@ -164,19 +331,13 @@ class ChatTab(Gtk.Box):
         else:
             self.add_message("assistant", f"Error: {error}")
 
-    def _get_agent(self):
-        if self._agent:
-            return self._agent
-        try:
-            from pydbus import SessionBus
-            self._agent = SessionBus().get(DBUS_AGENT, DBUS_AGENT_PATH)
-        except Exception:
-            self._agent = None
-        return self._agent
-
     def _on_voice(self, _btn) -> None:
-        import subprocess
-        subprocess.Popen(["/usr/lib/chi-voice/voice.sh"], start_new_session=True)
+        # Gio.Subprocess spawns without forking the Python heap and is
+        # reaped by the GLib main loop
+        try:
+            Gio.Subprocess.new(["/usr/lib/chi-voice/voice.sh"], Gio.SubprocessFlags.NONE)
+        except GLib.Error as e:
+            print(f"[chi-overlay] voice.sh launch failed: {e.message}")
 
 
 # ---------------------------------------------------------------------------
@@ -215,40 +376,88 @@ class HistoryTab(Gtk.Box):
 
         scroll = Gtk.ScrolledWindow()
         scroll.set_vexpand(True)
+        # Fetch further pages when scrolled to the end, or while the rows
+        # loaded so far don't fill the viewport
+        scroll.connect("edge-reached", self._on_edge_reached)
+        scroll.get_vadjustment().connect("changed", self._on_adjustment_changed)
         self.append(scroll)
 
         self._list = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         self._list.set_name("history-list")
         scroll.set_child(self._list)
 
+        # Paging state, touched only on the main thread
+        self._offset = 0         # conversations shown so far
+        self._loading = False
+        self._exhausted = True   # nothing to page until the first refresh
+        self._generation = 0     # bumped by refresh() to discard stale pages
+
     def refresh(self) -> None:
-        # Clear existing rows
-        while True:
-            child = self._list.get_first_child()
-            if child is None:
-                break
+        # Clear existing rows; collect first, then detach while hidden so
+        # the list is relaid out once rather than after every removal
+        children = []
+        child = self._list.get_first_child()
+        while child is not None:
+            children.append(child)
+            child = child.get_next_sibling()
+        self._list.set_visible(False)
+        for child in children:
             self._list.remove(child)
+        self._list.set_visible(True)
 
-        threading.Thread(target=self._load, daemon=True).start()
+        self._offset = 0
+        self._loading = False
+        self._exhausted = False
+        self._generation += 1
+        self._load_page()
 
-    def _load(self) -> None:
-        try:
-            from pydbus import SessionBus
-            bus = SessionBus()
-            agent = bus.get(DBUS_AGENT, DBUS_AGENT_PATH)
-            raw = agent.GetHistory(30)
-            conversations = json.loads(raw)
-        except Exception as e:
-            conversations = []
-            GLib.idle_add(self._add_placeholder, f"Could not load history: {e}")
+    def _load_page(self) -> None:
+        if self._loading or self._exhausted:
             return
+        self._loading = True
+        _submit(self._load, self._generation, self._offset)
+
+    def _on_edge_reached(self, _scroll, pos) -> None:
+        if pos == Gtk.PositionType.BOTTOM:
+            self._load_page()
 
-        if not conversations:
-            GLib.idle_add(self._add_placeholder, "No conversation history yet.")
+    def _on_adjustment_changed(self, adj) -> None:
+        if adj.get_upper() <= adj.get_page_size():
+            self._load_page()
+
+    def _load(self, generation: int, offset: int) -> None:
+        try:
+            agent = get_agent()
+            raw = agent.GetHistoryPage(HISTORY_PAGE_SIZE, offset)
+            conversations = _loads(raw)
+        except Exception as e:
+            drop_agent()
+            GLib.idle_add(self._populate_rows, generation, [], f"Could not load history: {e}")
             return
 
+        GLib.idle_add(self._populate_rows, generation, conversations, None)
+
+    def _populate_rows(
+        self, generation: int, conversations: list[dict], error: str | None,
+    ) -> bool:
+        if generation != self._generation:
+            return False
+        self._loading = False
+        if error is not None:
+            self._exhausted = True
+            self._add_placeholder(error)
+            return False
+        if len(conversations) < HISTORY_PAGE_SIZE:
+            self._exhausted = True
+        if not conversations and self._offset == 0:
+            self._add_placeholder("No conversation history yet.")
+            return False
+
+        self._offset += len(conversations)
+        # All rows in one main-loop callback, so GTK lays the list out once
         for conv in conversations:
-            GLib.idle_add(self._add_conv_row, conv)
+            self._add_conv_row(conv)
+        return False
 
     def _add_conv_row(self, conv: dict) -> None:
         # Outer wrapper holds the row + its separator so we can remove both
@@ -300,28 +509,31 @@ class HistoryTab(Gtk.Box):
     def _on_delete_conv(self, _btn, conv_id: int, wrapper) -> None:
         def _do():
             try:
-                from pydbus import SessionBus
-                bus = SessionBus()
-                agent = bus.get(DBUS_AGENT, DBUS_AGENT_PATH)
+                agent = get_agent()
                 agent.DeleteConversation(conv_id)
             except Exception as e:
+                drop_agent()
                 print(f"[chi-overlay] DeleteConversation error: {e}")
-            GLib.idle_add(self._list.remove, wrapper)
+            GLib.idle_add(self._remove_row, wrapper)
 
-        threading.Thread(target=_do, daemon=True).start()
+        _submit(_do)
+
+    def _remove_row(self, wrapper) -> None:
+        self._list.remove(wrapper)
+        # Later pages start one conversation earlier now
+        self._offset = max(0, self._offset - 1)
 
     def _on_clear_all(self, _btn) -> None:
         def _do():
             try:
-                from pydbus import SessionBus
-                bus = SessionBus()
-                agent = bus.get(DBUS_AGENT, DBUS_AGENT_PATH)
+                agent = get_agent()
                 agent.ClearAllHistory()
             except Exception as e:
+                drop_agent()
                 print(f"[chi-overlay] ClearAllHistory error: {e}")
             GLib.idle_add(self.refresh)
 
-        threading.Thread(target=_do, daemon=True).start()
+        _submit(_do)
 
     def _add_placeholder(self, text: str) -> None:
         lbl = Gtk.Label(label=text)
@@ -384,48 +596,49 @@ class DataTab(Gtk.Box):
 
     def refresh(self) -> None:
         self._buffer.set_text("Loading…")
-        threading.Thread(target=self._load, daemon=True).start()
+        _submit(self._load)
 
     def _load(self) -> None:
         try:
-            from pydbus import SessionBus
-            bus = SessionBus()
-            agent = bus.get(DBUS_AGENT, DBUS_AGENT_PATH)
-            raw = agent.GetData(50)
-            data = json.loads(raw)
-            text = json.dumps(data, indent=2, ensure_ascii=False)
+            agent = get_agent()
+            # One orjson loads/dumps pass, on the worker pool rather than the GTK thread
+            text = _pretty(_loads(agent.GetData(50)))
         except Exception as e:
+            drop_agent()
             text = f"Could not load data: {e}"
         GLib.idle_add(self._buffer.set_text, text)
 
     def _on_export(self, _btn) -> None:
         def _do():
             try:
-                from pydbus import SessionBus
-                bus = SessionBus()
-                agent = bus.get(DBUS_AGENT, DBUS_AGENT_PATH)
+                agent = get_agent()
                 raw = agent.GetData(1000)
                 out = Path.home() / "Downloads" / "chi-data.json"
                 out.parent.mkdir(parents=True, exist_ok=True)
-                out.write_text(raw)
-                GLib.idle_add(self._buffer.set_text, f"Exported to {out}\n\n" + raw)
+                data = raw.encode()
+                out.write_bytes(data)
+                # Leave the data view as-is; just note where the export went
+                GLib.idle_add(self._append_line, f"Exported {len(data)} bytes to {out}")
             except Exception as e:
+                drop_agent()
                 GLib.idle_add(self._buffer.set_text, f"Export failed: {e}")
 
-        threading.Thread(target=_do, daemon=True).start()
+        _submit(_do)
+
+    def _append_line(self, text: str) -> None:
+        self._buffer.insert(self._buffer.get_end_iter(), f"\n{text}\n")
 
     def _on_clear_data(self, _btn) -> None:
         def _do():
             try:
-                from pydbus import SessionBus
-                bus = SessionBus()
-                agent = bus.get(DBUS_AGENT, DBUS_AGENT_PATH)
+                agent = get_agent()
                 agent.ClearData()
                 GLib.idle_add(self._buffer.set_text, "All collected data has been deleted.")
             except Exception as e:
+                drop_agent()
                 GLib.idle_add(self._buffer.set_text, f"Clear failed: {e}")
 
-        threading.Thread(target=_do, daemon=True).start()
+        _submit(_do)
 
 
 # ---------------------------------------------------------------------------
@@ -510,23 +723,49 @@ class ChiOverlay(Gtk.ApplicationWindow):
 class ChiOverlayApp(Gtk.Application):
     def __init__(self):
         super().__init__(
-            application_id="io.chios.Overlay",
+            application_id=APP_ID,
             flags=Gio.ApplicationFlags.IS_SERVICE,
         )
         self._window: ChiOverlay | None = None
+        # Reused for every D-Bus call the tabs make off the main thread
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="overlay")
+
+    def submit(self, fn, *args) -> None:
+        self._pool.submit(fn, *args)
+
+    def do_startup(self):
+        # Parse CSS once per process, not on every Super+Space activation
+        Gtk.Application.do_startup(self)
+        css = Gtk.CssProvider()
+        css_path = Path(CSS_FILE)
+        if css_path.exists():
+            css.load_from_path(str(css_path))
+        Gtk.StyleContext.add_provider_for_display(
+            Gdk.Display.get_default(),
+            css,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
+        )
+
+    def do_shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        Gtk.Application.do_shutdown(self)
+
+    def _on_window_realize(self, window: Gtk.Window) -> None:
+        # The renderer is only known once the window has a surface
+        if not _software_rendering(window):
+            return
+        css = Gtk.CssProvider()
+        css.load_from_data(SOFTWARE_CSS, -1)
+        Gtk.StyleContext.add_provider_for_display(
+            window.get_display(),
+            css,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION + 1,
+        )
 
     def do_activate(self):
         if self._window is None:
-            css = Gtk.CssProvider()
-            css_path = Path(CSS_FILE)
-            if css_path.exists():
-                css.load_from_path(str(css_path))
-            Gtk.StyleContext.add_provider_for_display(
-                Gdk.Display.get_default(),
-                css,
-                Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
-            )
             self._window = ChiOverlay(self)
+            self._window.connect("realize", self._on_window_realize)
 
         self._window.show_and_focus()
 
@@ -9,9 +9,10 @@ A bottom-anchored Wayland layer-shell panel providing:
 """
 
 import json
+import os
+import shlex
 import subprocess
 import sys
-import threading
 from datetime import datetime
 from pathlib import Path
 
@@ -23,6 +24,8 @@ from gi.repository import Gdk, GLib, Gio, Gtk, GtkLayerShell
 APPS_CONFIG = Path.home() / ".config/chi-shell/apps.json"
 CSS_FILE = "/usr/share/chi-shell/chi-shell.css"
 PANEL_HEIGHT = 56
+OVERLAY_APP_ID = "io.chios.Overlay"
+OVERLAY_APP_PATH = "/io/chios/Overlay"
 
 DEFAULT_APPS = [
     {"name": "Files", "icon": "system-file-manager", "exec": "nautilus"},
@@ -32,6 +35,20 @@ DEFAULT_APPS = [
 ]
 
 
+def _fixed_label(text: str | None, chars: int) -> Gtk.Widget:
+    """
+    A label sized by character count rather than by measuring its text.
+    Gtk.Inscription (GTK >= 4.8) skips the Pango layout on every measure pass;
+    older GTK gets a plain Gtk.Label.
+    """
+    if hasattr(Gtk, "Inscription"):
+        label = Gtk.Inscription.new(text)
+        label.set_min_chars(chars)
+        label.set_nat_chars(chars)
+        return label
+    return Gtk.Label(label=text or "")
+
+
 class ChiPanel(Gtk.ApplicationWindow):
     def __init__(self, app: Gtk.Application):
         super().__init__(application=app)
@@ -47,8 +64,9 @@ class ChiPanel(Gtk.ApplicationWindow):
         GtkLayerShell.set_anchor(self, GtkLayerShell.Edge.RIGHT, True)
         self.set_default_size(-1, PANEL_HEIGHT)
 
-        # Root layout
-        root = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
+        # Root layout: one row, three columns. A grid measures each child once
+        # instead of the repeated Box measure passes to share out spacer space.
+        root = Gtk.Grid()
         root.set_name("panel-root")
         self.set_child(root)
 
@@ -57,38 +75,32 @@ class ChiPanel(Gtk.ApplicationWindow):
         self._dock.set_name("panel-dock")
         self._dock.set_margin_start(8)
         self._dock.set_valign(Gtk.Align.CENTER)
-        root.append(self._dock)
-
-        # Expand spacer left
-        spacer_l = Gtk.Box()
-        spacer_l.set_hexpand(True)
-        root.append(spacer_l)
+        self._dock.set_halign(Gtk.Align.START)
+        root.attach(self._dock, 0, 0, 1, 1)
 
         # Center: chi button
         chi_btn = Gtk.Button()
         chi_btn.set_name("chi-button")
         chi_btn.set_valign(Gtk.Align.CENTER)
+        chi_btn.set_halign(Gtk.Align.CENTER)
+        chi_btn.set_hexpand(True)
         chi_content = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
         chi_icon = Gtk.Label(label="✦")
         chi_icon.set_name("chi-icon")
-        chi_text = Gtk.Label(label="Ask chi…")
+        chi_text = _fixed_label("Ask chi…", 8)
         chi_text.set_name("chi-label")
         chi_content.append(chi_icon)
         chi_content.append(chi_text)
         chi_btn.set_child(chi_content)
         chi_btn.connect("clicked", self._on_chi_clicked)
-        root.append(chi_btn)
-
-        # Expand spacer right
-        spacer_r = Gtk.Box()
-        spacer_r.set_hexpand(True)
-        root.append(spacer_r)
+        root.attach(chi_btn, 1, 0, 1, 1)
 
         # Right: system area (status + clock)
         sys_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
         sys_box.set_name("panel-sys")
         sys_box.set_margin_end(14)
         sys_box.set_valign(Gtk.Align.CENTER)
+        sys_box.set_halign(Gtk.Align.END)
 
         self._status_dot = Gtk.Label(label="●")
         self._status_dot.set_name("status-dot")
@@ -96,16 +108,16 @@ class ChiPanel(Gtk.ApplicationWindow):
         self._status_dot.set_tooltip_text("chi-agent: offline")
         sys_box.append(self._status_dot)
 
-        self._clock = Gtk.Label()
+        self._clock = _fixed_label(None, 8)  # "12:34 PM"
         self._clock.set_name("panel-clock")
         sys_box.append(self._clock)
 
-        root.append(sys_box)
+        root.attach(sys_box, 2, 0, 1, 1)
 
         self._load_apps()
+        self._last_clock: str | None = None
         self._tick()
-        GLib.timeout_add(1000, self._tick)
-        GLib.timeout_add(3000, self._poll_status)
+        self._watch_status()
 
     def _load_apps(self) -> None:
         apps = DEFAULT_APPS
@@ -116,6 +128,16 @@ class ChiPanel(Gtk.ApplicationWindow):
                 pass
 
         for a in apps:
+            # Tokenize once here rather than on every click; shlex keeps
+            # quoted arguments like "kitty -e 'tmux new'" intact
+            try:
+                argv = shlex.split(a["exec"])
+            except ValueError as e:
+                print(f"[chi-shell] bad exec for {a['name']}: {e}", file=sys.stderr)
+                continue
+            if not argv:
+                continue
+
             btn = Gtk.Button()
             btn.set_name("dock-btn")
             btn.set_tooltip_text(a["name"])
@@ -123,47 +145,109 @@ class ChiPanel(Gtk.ApplicationWindow):
             box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
             icon = Gtk.Image.new_from_icon_name(a.get("icon", "application-x-executable"))
             icon.set_pixel_size(20)
-            lbl = Gtk.Label(label=a["name"])
+            lbl = _fixed_label(a["name"], len(a["name"]))
             lbl.set_name("dock-label")
             box.append(icon)
             box.append(lbl)
             btn.set_child(box)
-            btn.connect("clicked", self._on_app_clicked, a["exec"])
+            btn.connect("clicked", self._on_app_clicked, argv)
             self._dock.append(btn)
 
-    def _on_app_clicked(self, _btn, exec_cmd: str) -> None:
+    def _on_app_clicked(self, _btn, argv: list[str]) -> None:
         try:
-            subprocess.Popen(exec_cmd.split(), start_new_session=True)
+            if hasattr(os, "posix_spawnp"):
+                # posix_spawn skips fork()'s copy of the panel's page tables
+                pid = os.posix_spawnp(argv[0], argv, os.environ, setsid=True)
+                # Reap on the main loop so the app doesn't linger as a zombie
+                GLib.child_watch_add(GLib.PRIORITY_DEFAULT, pid, lambda *_: None)
+            else:
+                subprocess.Popen(argv, start_new_session=True)
         except Exception as e:
-            print(f"[chi-shell] launch failed: {exec_cmd}: {e}", file=sys.stderr)
+            print(f"[chi-shell] launch failed: {shlex.join(argv)}: {e}", file=sys.stderr)
 
     def _on_chi_clicked(self, _btn) -> None:
-        # Launch or re-activate chi-overlay (GTK IS_SERVICE handles singleton)
+        # A running overlay is raised over D-Bus; only start a new Python
+        # process (and its GTK import) when nobody owns the name
+        try:
+            bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        except GLib.Error:
+            self._launch_overlay()
+            return
+        bus.call(
+            OVERLAY_APP_ID, OVERLAY_APP_PATH, "org.freedesktop.Application", "Activate",
+            GLib.Variant("(a{sv})", ({},)), None,
+            Gio.DBusCallFlags.NO_AUTO_START, 1000, None, self._on_overlay_activated,
+        )
+
+    def _on_overlay_activated(self, bus, result) -> None:
+        try:
+            bus.call_finish(result)
+        except GLib.Error:
+            self._launch_overlay()
+
+    def _launch_overlay(self) -> None:
+        # Launch chi-overlay (GTK IS_SERVICE handles singleton)
         subprocess.Popen(
             ["python3", "/usr/lib/chi-overlay/overlay.py"],
             start_new_session=True,
         )
 
     def _tick(self) -> bool:
-        self._clock.set_text(datetime.now().strftime("%-I:%M %p"))
-        return True
-
-    def _poll_status(self) -> bool:
-        def _check():
-            try:
-                from pydbus import SessionBus
-                bus = SessionBus()
-                agent = bus.get("io.chios.Agent", "/io/chios/Agent")
-                status = agent.GetStatus()
-            except Exception:
-                status = "offline"
-            GLib.idle_add(self._update_status, status)
-
-        threading.Thread(target=_check, daemon=True).start()
-        return True
+        now = datetime.now()
+        clock = now.strftime("%-I:%M %p")
+        if clock != self._last_clock:
+            self._last_clock = clock
+            self._clock.set_text(clock)
+        # Only minutes are shown: wake once, at the next minute boundary
+        GLib.timeout_add_seconds(60 - now.second, self._tick)
+        return False
+
+    def _watch_status(self) -> None:
+        """
+        Follow chi-agent status through a single Gio.DBusProxy: StatusChanged
+        arrives as g-signal, and name-owner changes mark the agent up or down.
+        """
+        self._agent_proxy = None
+        try:
+            self._agent_proxy = Gio.DBusProxy.new_for_bus_sync(
+                Gio.BusType.SESSION,
+                Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES | Gio.DBusProxyFlags.DO_NOT_AUTO_START,
+                None,
+                "io.chios.Agent",
+                "/io/chios/Agent",
+                "io.chios.Agent",
+                None,
+            )
+        except GLib.Error as e:
+            print(f"[chi-shell] session bus unavailable: {e.message}", file=sys.stderr)
+            self._update_status("offline")
+            return
+        self._agent_proxy.connect("g-signal", self._on_status_changed)
+        self._agent_proxy.connect("notify::g-name-owner", lambda *_: self._poll_status())
+        self._poll_status()
+
+    def _on_status_changed(self, _proxy, _sender, signal, params) -> None:
+        if signal == "StatusChanged":
+            self._update_status(params.unpack()[0])
+
+    def _poll_status(self) -> None:
+        proxy = self._agent_proxy
+        if proxy is None or proxy.get_name_owner() is None:
+            self._update_status("offline")
+            return
+        proxy.call("GetStatus", None, Gio.DBusCallFlags.NONE, 1000, None, self._on_status_cb)
+
+    def _on_status_cb(self, proxy, result) -> None:
+        try:
+            status = proxy.call_finish(result).unpack()[0]
+        except GLib.Error:
+            status = "offline"
+        self._update_status(status)
 
     def _update_status(self, status: str) -> None:
-        css_classes = ["status-ready", "status-thinking", "status-error", "status-offline"]
+        css_classes = [
+            "status-ready", "status-thinking", "status-streaming", "status-error", "status-offline",
+        ]
         for c in css_classes:
             self._status_dot.remove_css_class(c)
         self._status_dot.add_css_class(f"status-{status}")
@@ -176,8 +260,12 @@ class ChiShellApp(Gtk.Application):
             application_id="io.chios.Shell",
             flags=Gio.ApplicationFlags.FLAGS_NONE,
         )
+        self._window: ChiPanel | None = None
 
-    def do_activate(self):
+    def do_startup(self):
+        # Install the stylesheet once per process; every re-activation used
+        # to stack another provider on the display
+        Gtk.Application.do_startup(self)
         css = Gtk.CssProvider()
         css_path = Path(CSS_FILE)
         if css_path.exists():
@@ -187,8 +275,11 @@ class ChiShellApp(Gtk.Application):
             css,
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
         )
-        win = ChiPanel(self)
-        win.present()
+
+    def do_activate(self):
+        if self._window is None:
+            self._window = ChiPanel(self)
+        self._window.present()
 
 
 if __name__ == "__main__":
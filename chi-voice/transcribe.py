@@ -2,39 +2,189 @@
 """
 Transcribe audio using faster-whisper.
 Usage: python3 transcribe.py <input.wav> <output.txt>
+       python3 transcribe.py --daemon
+
+The daemon keeps one WhisperModel loaded and serves requests on a Unix
+socket, so the model load is paid once per session instead of per utterance.
+It is socket-activated by chi-voice.socket: the model is only loaded once
+someone actually speaks. The CLI form sends the wav path to the daemon and
+falls back to loading the model in-process when the socket is missing.
 """
 
+import os
+import socket
+import socketserver
 import sys
+import wave
 from pathlib import Path
 
+SOCKET_PATH = Path(os.environ.get("XDG_RUNTIME_DIR", "/tmp")) / "chi-voice.sock"
+SD_LISTEN_FDS_START = 3  # first fd systemd passes to a socket-activated service
+EXIT_NO_WHISPER = 78  # EX_CONFIG; chi-voice.service won't restart on it
+CLIENT_TIMEOUT = 120
+SAMPLE_RATE = 16000  # Whisper's native rate; voice.sh records at it
+VAD_MIN_SECONDS = 4.0  # below this, Silero VAD costs about as much as decoding
+FALLBACK_LOGPROB = -1.0  # greedy segments below this are re-decoded with beam search
+FALLBACK_BEAM_SIZE = 5
+# Concurrent transcriptions the daemon runs; CTranslate2 releases the GIL
+# while decoding, so handler threads scale with model workers. Each extra
+# worker is another decoder replica and splits the CPU threads, so one
+# push-to-talk request at a time gets the whole machine unless raised.
+DAEMON_WORKERS = max(1, int(os.environ.get("CHI_VOICE_WORKERS", "1")))
 
-def transcribe(wav_path: str, output_path: str) -> None:
+
+def load_model(workers: int = 1):
+    # Must be set before CTranslate2's OpenMP runtime starts
+    os.environ.setdefault("KMP_AFFINITY", "granularity=fine,compact,1,0")
     try:
+        import ctranslate2
         from faster_whisper import WhisperModel
     except ImportError:
         print("faster-whisper not installed. Run: pip install faster-whisper", file=sys.stderr)
-        sys.exit(1)
+        sys.exit(EXIT_NO_WHISPER)
+
+    # int8 weights with fp16 compute hits tensor cores when a GPU is present
+    if ctranslate2.get_cuda_device_count() > 0:
+        return WhisperModel(
+            "medium", device="cuda", compute_type="int8_float16", num_workers=workers,
+        )
+
+    # medium model, CPU inference, int8 quantization for speed.
+    # One thread per physical core, split across workers; hyperthreads only
+    # contend for the matmul units.
+    cpu_threads = max(1, (os.cpu_count() or 2) // 2 // workers)
+    return WhisperModel(
+        "medium", device="cpu", compute_type="int8",
+        cpu_threads=cpu_threads, num_workers=workers,
+    )
+
 
-    # medium model, CPU inference, int8 quantization for speed
-    model = WhisperModel("medium", device="cpu", compute_type="int8")
+def load_audio(wav_path: str):
+    """
+    Decode a PCM16 mono 16 kHz wav straight into the float32 array
+    faster-whisper expects, skipping its ffmpeg decode/resample pass.
+    Anything else is returned as the path for faster-whisper to decode.
+    Returns (audio, duration_seconds).
+    """
+    import numpy as np
 
+    with wave.open(wav_path, "rb") as wav:
+        rate = wav.getframerate()
+        if (wav.getsampwidth(), wav.getnchannels(), rate) != (2, 1, SAMPLE_RATE):
+            return wav_path, wav.getnframes() / rate
+        pcm = wav.readframes(wav.getnframes())
+    audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    return audio, len(audio) / SAMPLE_RATE
+
+
+def _decode(model, audio, use_vad: bool, beam_size: int) -> list:
     segments, info = model.transcribe(
-        wav_path,
+        audio,
         language="en",
-        beam_size=5,
-        vad_filter=True,
-        vad_parameters={"min_silence_duration_ms": 500},
+        beam_size=beam_size,
+        best_of=1,
+        temperature=0.0,
+        condition_on_previous_text=False,
+        vad_filter=use_vad,
+        vad_parameters={"min_silence_duration_ms": 500} if use_vad else None,
     )
+    return list(segments)
+
+
+def run_model(model, wav_path: str) -> str:
+    audio, duration = load_audio(wav_path)
+    # Short push-to-talk clips have little silence to trim; skip the VAD pass
+    use_vad = duration >= VAD_MIN_SECONDS
+
+    # Greedy first; only pay for beam search when the greedy pass is unsure
+    segments = _decode(model, audio, use_vad, beam_size=1)
+    if segments and min(seg.avg_logprob for seg in segments) < FALLBACK_LOGPROB:
+        segments = _decode(model, audio, use_vad, beam_size=FALLBACK_BEAM_SIZE)
 
     text_parts = [segment.text.strip() for segment in segments]
-    transcript = " ".join(text_parts).strip()
+    return " ".join(text_parts).strip()
+
+
+# ---------------------------------------------------------------------------
+# Daemon
+# ---------------------------------------------------------------------------
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        wav_path = self.rfile.readline().decode().strip()
+        try:
+            transcript = run_model(self.server.model, wav_path)
+        except Exception as e:
+            print(f"Transcription failed for {wav_path}: {e}", file=sys.stderr)
+            transcript = ""
+        self.wfile.write(transcript.encode())
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve() -> None:
+    # One model, DAEMON_WORKERS replicas of its decoder; requests beyond
+    # that queue inside CTranslate2 rather than oversubscribing the CPU
+    model = load_model(DAEMON_WORKERS)
+    if _systemd_socket_passed():
+        # Connections that arrived while the model loaded wait in the backlog
+        server = _Server(str(SOCKET_PATH), _Handler, bind_and_activate=False)
+        server.socket.close()
+        server.socket = socket.socket(fileno=SD_LISTEN_FDS_START)
+    else:
+        SOCKET_PATH.unlink(missing_ok=True)
+        server = _Server(str(SOCKET_PATH), _Handler)
+        os.chmod(SOCKET_PATH, 0o600)
+    with server:
+        server.model = model
+        print(f"chi-voice listening on {SOCKET_PATH}", file=sys.stderr)
+        server.serve_forever()
+
+
+def _systemd_socket_passed() -> bool:
+    """True when systemd handed this process its listening socket (sd_listen_fds)."""
+    return (
+        os.environ.get("LISTEN_PID") == str(os.getpid())
+        and os.environ.get("LISTEN_FDS") == "1"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+def _ask_daemon(wav_path: str) -> str | None:
+    """Return the daemon's transcript, or None if the daemon is unreachable."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CLIENT_TIMEOUT)
+            sock.connect(str(SOCKET_PATH))
+            sock.sendall(os.path.abspath(wav_path).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while chunk := sock.recv(4096):
+                chunks.append(chunk)
+    except OSError:
+        return None
+    return b"".join(chunks).decode()
+
+
+def transcribe(wav_path: str, output_path: str) -> None:
+    transcript = _ask_daemon(wav_path)
+    if transcript is None:
+        transcript = run_model(load_model(), wav_path)
 
     Path(output_path).write_text(transcript)
     print(f"Transcribed: {transcript}", file=sys.stderr)
 
 
 if __name__ == "__main__":
+    if sys.argv[1:] == ["--daemon"]:
+        serve()
+        sys.exit(0)
     if len(sys.argv) != 3:
-        print(f"Usage: {sys.argv[0]} <input.wav> <output.txt>", file=sys.stderr)
+        print(f"Usage: {sys.argv[0]} <input.wav> <output.txt> | --daemon", file=sys.stderr)
         sys.exit(1)
     transcribe(sys.argv[1], sys.argv[2])
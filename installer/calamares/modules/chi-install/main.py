@@ -7,15 +7,15 @@ Install flow:
   2. Run `bootc install to-disk <disk>` — handles partitioning + bootloader
   3. Mount the installed root partition
   4. Create the user account (useradd + chpasswd)
-  5. Set the hostname
+  5. Set the hostname (4 and 5 share one chroot shell)
   6. Unmount
 
 bootc install to-disk requires that the live environment has already
 pulled the OCI image (done in the kickstart %post via `podman pull`).
 """
 
-import json
 import os
+import re
 import subprocess
 import tempfile
 import time
@@ -25,11 +25,28 @@ import libcalamares
 # Injected by build-installer.sh
 CHIOS_IMAGE = "CHIOS_IMAGE_PLACEHOLDER"
 
+# Up to 2 s for the root partition to appear after bootc install
+ROOT_PART_POLLS = 20
+ROOT_PART_POLL_INTERVAL = 0.1
+
+# Run inside the installed root as: sh -c ACCOUNT_SCRIPT sh <username> <hostname>
+# with "<username>:<password>" on stdin for chpasswd. Each step reports its
+# own failure on stderr; the exit status is non-zero if any step failed.
+ACCOUNT_SCRIPT = """
+status=0
+useradd -m -G wheel,users,video,audio -s /bin/bash "$1" </dev/null
+rc=$?
+if [ "$rc" -ne 0 ] && [ "$rc" -ne 9 ]; then  # 9 = user already exists
+    echo "useradd exited $rc" >&2; status=1
+fi
+chpasswd || { echo "chpasswd failed" >&2; status=1; }
+printf '%s\\n' "$2" > /etc/hostname || { echo "hostname write failed" >&2; status=1; }
+exit $status
+"""
+
 # ─── helpers ────────────────────────────────────────────────────────────────
 
-def run(cmd, **kwargs):
-    """Run a command, return CompletedProcess. Raises on non-zero exit."""
-    return subprocess.run(cmd, capture_output=True, text=True, **kwargs)
+_LSBLK_PAIR = re.compile(r'(\w+)="([^"]*)"')
 
 
 def find_root_partition(disk: str) -> str | None:
@@ -43,33 +60,25 @@ def find_root_partition(disk: str) -> str | None:
 
     We pick the largest non-EFI partition.
     """
-    result = run(["lsblk", "-J", "-b", "-o", "NAME,TYPE,FSTYPE,SIZE", disk])
+    # --pairs gives one KEY="value" line per device; no JSON tree to walk
+    result = subprocess.run(
+        ["lsblk", "-P", "-b", "-o", "NAME,TYPE,FSTYPE,SIZE", disk],
+        capture_output=True, text=True
+    )
     if result.returncode != 0:
         return None
 
-    try:
-        data = json.loads(result.stdout)
-    except json.JSONDecodeError:
-        return None
+    candidates = []
+    for line in result.stdout.splitlines():
+        fields = dict(_LSBLK_PAIR.findall(line))
+        if fields.get("TYPE") == "part" and fields.get("FSTYPE") in ("xfs", "ext4", "btrfs"):
+            candidates.append(fields)
 
-    partitions = []
-    for dev in data.get("blockdevices", []):
-        for child in dev.get("children", []):
-            if child.get("type") != "part":
-                continue
-            fstype = child.get("fstype", "")
-            if fstype in ("xfs", "ext4", "btrfs"):
-                try:
-                    size = int(child.get("size", 0))
-                except (TypeError, ValueError):
-                    size = 0
-                partitions.append((size, f"/dev/{child['name']}"))
-
-    if not partitions:
+    if not candidates:
         return None
 
-    partitions.sort(reverse=True)
-    return partitions[0][1]
+    best = max(candidates, key=lambda c: int(c["SIZE"]) if c.get("SIZE", "").isdigit() else 0)
+    return f"/dev/{best['NAME']}"
 
 
 # ─── Calamares interface ─────────────────────────────────────────────────────
@@ -138,11 +147,18 @@ def run() -> None | tuple[str, str]:
     libcalamares.utils.debug("chi-install: bootc install complete")
 
     # ── Step 3: Find and mount the installed root partition ──────────────────
-    # Give the kernel a moment to re-read the partition table
-    time.sleep(2)
-    subprocess.run(["udevadm", "settle"], capture_output=True)
-
-    root_part = find_root_partition(disk)
+    # Wait for udev to publish the new partition table, then poll briefly
+    # for the root partition instead of sleeping a fixed worst case
+    subprocess.run(
+        ["udevadm", "settle", "--timeout=5"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    root_part = None
+    for _ in range(ROOT_PART_POLLS):
+        root_part = find_root_partition(disk)
+        if root_part:
+            break
+        time.sleep(ROOT_PART_POLL_INTERVAL)
     if not root_part:
         return (
             "Could not find root partition",
@@ -164,59 +180,38 @@ def run() -> None | tuple[str, str]:
                 f"Could not mount {root_part} at {mount_point}:\n{mnt.stderr}",
             )
 
-        # Mount /proc, /sys, /dev so chroot works
+        # Mount /proc, /sys, /dev so chroot works. Recursive binds pick up
+        # /dev/pts, /sys/fs/cgroup etc.; rslave keeps unmounts under the
+        # target from propagating back to the live system's mounts.
         for bind in ("/proc", "/sys", "/dev"):
             subprocess.run(
-                ["mount", "--bind", bind, mount_point + bind],
-                capture_output=True
+                ["mount", "--rbind", "--make-rslave", bind, mount_point + bind],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
             )
 
         libcalamares.job.setprogress(0.88)
 
-        # ── Step 4: Create user ───────────────────────────────────────────────
+        # ── Steps 4–5: Create user, set password and hostname ────────────────
+        # One chroot shell for all three; the password goes in on stdin
         libcalamares.utils.debug(f"chi-install: creating user {username}")
 
-        useradd = subprocess.run(
-            [
-                "chroot", mount_point,
-                "useradd", "-m", "-G", "wheel,users,video,audio",
-                "-s", "/bin/bash", username,
-            ],
-            capture_output=True, text=True
-        )
-        if useradd.returncode not in (0, 9):  # 9 = user already exists
-            libcalamares.utils.warning(f"useradd: {useradd.stderr}")
-
-        # Set password via chpasswd
-        chpasswd = subprocess.run(
-            ["chroot", mount_point, "chpasswd"],
+        account = subprocess.run(
+            ["chroot", mount_point, "/bin/sh", "-c", ACCOUNT_SCRIPT, "sh", username, hostname],
             input=f"{username}:{password}\n",
             capture_output=True, text=True
         )
-        if chpasswd.returncode != 0:
-            libcalamares.utils.warning(f"chpasswd: {chpasswd.stderr}")
-
-        libcalamares.job.setprogress(0.92)
-
-        # ── Step 5: Set hostname ──────────────────────────────────────────────
-        hostname_file = os.path.join(mount_point, "etc", "hostname")
-        try:
-            os.makedirs(os.path.dirname(hostname_file), exist_ok=True)
-            with open(hostname_file, "w") as f:
-                f.write(hostname + "\n")
-        except OSError as e:
-            libcalamares.utils.warning(f"hostname write: {e}")
+        if account.returncode != 0:
+            libcalamares.utils.warning(f"account setup: {account.stderr}")
 
         libcalamares.job.setprogress(0.95)
 
     finally:
         # ── Step 6: Unmount ───────────────────────────────────────────────────
-        for bind in ("/dev", "/sys", "/proc"):
-            subprocess.run(
-                ["umount", "-l", mount_point + bind],
-                capture_output=True
-            )
-        subprocess.run(["umount", "-l", mount_point], capture_output=True)
+        # One recursive lazy unmount covers the root and every bind under it
+        subprocess.run(
+            ["umount", "-R", "-l", mount_point],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
         try:
             os.rmdir(mount_point)
         except OSError: